@@ -0,0 +1,62 @@
+"""
+Per-call cost of parsing condition durations.
+
+Compares the previous parse_timedelta, which defined a pydantic model on every call,
+with the ISO 8601 parser with and without its cache.
+
+Usage: python -m benchmarks.bench_duration_parser [--number 20000]
+"""
+import argparse
+import timeit
+from datetime import timedelta
+
+from pydantic import BaseModel
+
+from src.priority.durations import parse_duration, _parse_iso_8601_duration
+
+VALUES = ['PT2H', 'P1D', 'P1DT2H30M', 'PT30M', 'P7D', 'PT1.5H', 'P2W', 'PT45S']
+
+
+def legacy_parse_timedelta(time_str: str) -> timedelta:
+    """The parser before the durations module."""
+    class TimedeltaParser(BaseModel):
+        timedelta: timedelta
+
+    parser = TimedeltaParser(timedelta=time_str)
+    return parser.timedelta
+
+
+def uncached_parse_duration(time_str: str) -> timedelta:
+    """The ISO 8601 parser without the cache."""
+    return _parse_iso_8601_duration(time_str)
+
+
+def per_call_microseconds(parse, number: int) -> float:
+    """Average microseconds per parsed value, over all sample values."""
+    def parse_values():
+        for value in VALUES:
+            parse(value)
+
+    seconds = min(timeit.repeat(parse_values, number=number, repeat=3))
+    return seconds / (number * len(VALUES)) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20000, help='Passes over the sample values per measurement')
+    args = parser.parse_args()
+
+    legacy_number = max(args.number // 100, 1)
+    results = [
+        ('legacy pydantic model per call', per_call_microseconds(legacy_parse_timedelta, legacy_number)),
+        ('ISO 8601 parser, uncached', per_call_microseconds(uncached_parse_duration, args.number)),
+        ('ISO 8601 parser, cached', per_call_microseconds(parse_duration, args.number)),
+    ]
+
+    legacy = results[0][1]
+    for name, microseconds in results:
+        print(f'{name:<32} {microseconds:>10.3f} us/call {legacy / microseconds:>10.1f}x')
+
+
+if __name__ == '__main__':
+    main()
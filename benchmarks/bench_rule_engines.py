@@ -0,0 +1,100 @@
+"""
+Per-task cost of scoring with the rule by rule engine and with the decision diagram.
+
+Scores the same tasks with a PriorityCalculator, and with a PriorityCalculator compiling
+the rules into a decision diagram, for rule sets of 10, 100 and 1000 rules.
+The rules combine a category, a tag and a duration or deadline condition from shared vocabularies,
+like the narrowly targeted rules of users with many rules.
+
+Usage: python -m benchmarks.bench_rule_engines [--tasks 2000] [--number 5]
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src.priority.core import PriorityCalculator, ConditionEvaluator
+
+RULE_COUNTS = (10, 100, 1000)
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+CATEGORIES = [f'category{index}' for index in range(10)]
+TAGS = [f'tag{index}' for index in range(30)]
+TIME_CONDITIONS = [
+    ('duration', 'less_than', 'PT30M'), ('duration', 'less_than', 'PT2H'), ('duration', 'greater_than', 'PT4H'),
+    ('deadline', 'less_than', 'P1D'), ('deadline', 'less_than', 'P7D'), ('created_at', 'greater_than', 'P14D'),
+]
+
+
+def make_rules(count: int, rng: random.Random):
+    """Rule like objects with one to three conditions."""
+    rules = []
+    for rule_id in range(count):
+        conditions = [('category', 'equals', rng.choice(CATEGORIES))]
+        if rng.random() < 0.7:
+            conditions.append(('tag', 'equals', rng.choice(TAGS)))
+        if rng.random() < 0.5:
+            conditions.append(rng.choice(TIME_CONDITIONS))
+        rules.append(SimpleNamespace(
+            id=rule_id,
+            boost=rng.randint(1, 20),
+            conditions=[SimpleNamespace(field=field, operator=operator, value=value)
+                        for field, operator, value in conditions],
+        ))
+    return rules
+
+
+def make_tasks(count: int, rng: random.Random):
+    """Task like objects with a category, up to four tags and time values around NOW."""
+    return [
+        SimpleNamespace(
+            category=SimpleNamespace(name=rng.choice(CATEGORIES)),
+            tags=[SimpleNamespace(name=name) for name in rng.sample(TAGS, rng.randint(0, 4))],
+            duration=timedelta(minutes=rng.randint(5, 480)),
+            deadline=NOW + timedelta(hours=rng.randint(-24, 24 * 14)),
+            created_at=NOW - timedelta(days=rng.randint(0, 30)),
+        )
+        for _ in range(count)
+    ]
+
+
+def per_task_microseconds(calculator: PriorityCalculator, rules, tasks, number: int):
+    """Average microseconds per scored task, with the rules compiled and bound once, and the total score."""
+    compiled_rules = calculator.rule_compiler.compile(rules)
+    context = calculator.scoring_context()
+
+    def score_tasks():
+        return sum(calculator.calculate_task_score(task, compiled_rules, context) for task in tasks)
+
+    total = score_tasks()
+    seconds = min(timeit.repeat(score_tasks, number=number, repeat=3))
+    return seconds / (number * len(tasks)) * 1_000_000, total, compiled_rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=2000, help='Number of scored tasks')
+    parser.add_argument('--number', type=int, default=5, help='Passes over the tasks per measurement')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    tasks = make_tasks(args.tasks, rng)
+    clock = lambda: NOW
+    rules_calculator = PriorityCalculator(ConditionEvaluator(clock))
+    diagram_calculator = PriorityCalculator(ConditionEvaluator(clock), decision_diagram=True)
+
+    for rule_count in RULE_COUNTS:
+        rules = make_rules(rule_count, rng)
+        rules_us, rules_total, _ = per_task_microseconds(rules_calculator, rules, tasks, args.number)
+        diagram_us, diagram_total, compiled_rules = per_task_microseconds(
+            diagram_calculator, rules, tasks, args.number
+        )
+        assert rules_total == diagram_total, 'the engines gave different scores'
+
+        diagram_size = compiled_rules.diagram.size if compiled_rules.diagram is not None else 'too large'
+        print(f'{rule_count:>5} rules  rules {rules_us:>8.2f} us/task  diagram {diagram_us:>8.2f} us/task '
+              f'{rules_us / diagram_us:>6.1f}x  ({diagram_size} nodes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Cost of rendering a TasksListResponse of many tasks.
+
+Compares the previous rendering, where the route dumped the model to a dict for jsonify
+and the response was then parsed and validated again against the response model,
+with returning the validated model, which is dumped straight to JSON bytes.
+
+Usage: python -m benchmarks.bench_task_serialization [--tasks 10000] [--number 5]
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src.priority.api.tasks.schemas import TasksListResponse
+from src.priority.json_provider import PydanticJSONProvider
+
+
+def make_tasks(count: int):
+    """Task like objects with a category and two tags, as loaded for a listing."""
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    category = SimpleNamespace(id=1, name='work')
+    tags = [SimpleNamespace(id=1, name='urgent'), SimpleNamespace(id=2, name='important')]
+
+    return [
+        SimpleNamespace(
+            id=task_id,
+            priority_score=task_id % 50,
+            title=f'Task {task_id}',
+            completed=False,
+            duration=timedelta(minutes=task_id % 300),
+            deadline=created_at + timedelta(hours=task_id),
+            category=category,
+            tags=tags,
+            created_at=created_at,
+        )
+        for task_id in range(count)
+    ]
+
+
+def render_previous(tasks) -> bytes:
+    """model_dump to a dict, stdlib json encoding, then response validation of the encoded payload."""
+    response_model = TasksListResponse.model_validate({'tasks': tasks, 'next_cursor': None})
+    payload = json.dumps(response_model.model_dump(mode='json'), sort_keys=True).encode()
+    TasksListResponse.model_validate_json(payload)
+    return payload
+
+
+def render_model(tasks) -> bytes:
+    """The validated model dumped straight to JSON bytes."""
+    response_model = TasksListResponse.model_validate({'tasks': tasks, 'next_cursor': None})
+    return PydanticJSONProvider._dump_bytes(response_model)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10000, help='Tasks in the listing')
+    parser.add_argument('--number', type=int, default=5, help='Renders per measurement')
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    assert json.loads(render_previous(tasks)) == json.loads(render_model(tasks))
+
+    results = [
+        ('dict + stdlib json + revalidation', render_previous),
+        ('model dumped to JSON bytes', render_model),
+    ]
+    timings = [
+        (name, min(timeit.repeat(lambda: render(tasks), number=args.number, repeat=3)) / args.number * 1000)
+        for name, render in results
+    ]
+
+    previous = timings[0][1]
+    for name, milliseconds in timings:
+        print(f'{name:<36} {milliseconds:>10.1f} ms/response {previous / milliseconds:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -14,3 +14,9 @@ pg_db = os.getenv("POSTGRES_DB", pg_user)
 db = f"postgresql+psycopg://{pg_user}:{pg_pass}@{pg_host}:{pg_port}/{pg_db}"
 SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", db)
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+# Priority scoring: 'python' scores tasks in the app, 'sql' scores, filters and orders them in the database,
+# 'materialized' orders them by the scores stored on tasks (refreshed with `flask tasks refresh-scores`).
+PRIORITY_SCORING_BACKEND = os.getenv("PRIORITY_SCORING_BACKEND", "python")
+# Task responses depending on deadline or created_at rules are cached by clients
+# for at most this many seconds, since their scores change with time.
+ETAG_TIME_BUCKET_SECONDS = int(os.getenv("ETAG_TIME_BUCKET_SECONDS", 60))
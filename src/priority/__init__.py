@@ -4,12 +4,15 @@ from src.priority.api.auth.routes import auth
 from src.priority.api.users.routes import users
 from src.priority.api.rules.routes import rules
 from src.priority.api.tasks.routes import tasks
+from src.priority.api.tasks.commands import tasks_cli
 from .errors import errors
+from .json_provider import PydanticJSONProvider
 from .extensions import api
 from flask_jwt_extended import JWTManager
 
 def create_app(override_settings=None):
     app = Flask(__name__)
+    app.json = PydanticJSONProvider(app)
 
     app.config.from_object("src.config.settings")
     if override_settings:
@@ -25,6 +28,8 @@ def create_app(override_settings=None):
     app.register_blueprint(tasks)
     app.register_blueprint(errors)
 
+    app.cli.add_command(tasks_cli)
+
     api.register(app)
 
     return app
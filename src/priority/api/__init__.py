@@ -1,12 +1,21 @@
-from ..core import PriorityCalculator, ConditionEvaluator
+from ..core import PriorityCalculator, ConditionEvaluator, CompiledRuleSetCache, SqlScoreBuilder, BatchScorer
 from .rules.service import RuleService
 from .tasks.service import TaskService
+from .tasks.scores import TaskScoreService
+from .tasks.imports import TaskImportService
 from .auth.service import AuthService
 from .users.service import UserService
+from .etags import ETagService
 
+ruleset_cache = CompiledRuleSetCache()
 condition_evaluator = ConditionEvaluator()
-priority_calculator = PriorityCalculator(condition_evaluator)
-rule_service = RuleService()
-task_service = TaskService(priority_calculator)
+priority_calculator = PriorityCalculator(condition_evaluator, ruleset_cache)
+sql_score_builder = SqlScoreBuilder()
+batch_scorer = BatchScorer()
+task_score_service = TaskScoreService(priority_calculator, sql_score_builder, batch_scorer)
+rule_service = RuleService(ruleset_cache, task_score_service)
+task_service = TaskService(priority_calculator, sql_score_builder, task_score_service)
+task_import_service = TaskImportService(task_service)
 auth_service = AuthService()
 user_service = UserService()
+etag_service = ETagService(priority_calculator)
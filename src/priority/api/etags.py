@@ -0,0 +1,94 @@
+import hashlib
+from functools import wraps
+from typing import Callable
+
+import sqlalchemy as sa
+from flask import current_app, make_response, request
+
+from src.priority.extensions import db
+from src.priority.core import PriorityCalculator
+from .users.models import User
+
+
+class ETagService:
+    """
+    Computes the strong ETags of the user's task and rule responses.
+    A tag is derived from the user's data versions, which every task or rule write bumps,
+    so it can be computed with a primary key lookup, without loading or scoring tasks.
+    The versions are stored on the user row rather than in memory, since app workers don't share memory.
+    Task scores also change with time when the user has deadline or created_at rules,
+    so task tags then include the time bucket of ETAG_TIME_BUCKET_SECONDS they were computed in.
+    """
+
+    def __init__(self, priority_calculator: PriorityCalculator):
+        self.priority_calculator = priority_calculator
+
+    def tasks_etag(self, user_id: int, *parts) -> str:
+        """Tag of a task response of the user, the parts identify the response (like its query string)."""
+        tasks_version, rules_version = self._versions(user_id)
+        time_bucket = None
+        if self._scores_change_with_time(user_id, rules_version):
+            bucket_seconds = current_app.config.get('ETAG_TIME_BUCKET_SECONDS', 60)
+            time_bucket = int(self.priority_calculator.clock().timestamp()) // bucket_seconds
+
+        return self._hash('tasks', user_id, tasks_version, rules_version, time_bucket, *parts)
+
+    def rules_etag(self, user_id: int, *parts) -> str:
+        """Tag of a rule response of the user, the parts identify the response (like the rule id)."""
+        _, rules_version = self._versions(user_id)
+
+        return self._hash('rules', user_id, rules_version, *parts)
+
+    def _versions(self, user_id: int):
+        """Selects the user's tasks and rules versions, zeros for a missing user."""
+        versions = db.session.execute(
+            sa.select(User.tasks_version, User.rules_version).where(User.id == user_id)
+        ).one_or_none()
+
+        return tuple(versions) if versions is not None else (0, 0)
+
+    def _scores_change_with_time(self, user_id: int, rules_version: int) -> bool:
+        """
+        Checks if the user's task scores depend on the current time.
+        The compiled rules are usually cached, otherwise they are compiled and cached
+        here instead of in the view, so the tag doesn't change once they are cached.
+        """
+        ruleset_cache = self.priority_calculator.ruleset_cache
+        compiled_rules = ruleset_cache.get(user_id, rules_version) if ruleset_cache is not None else None
+        if compiled_rules is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                return False
+            compiled_rules = self.priority_calculator.compile_user_rules(user)
+
+        return compiled_rules.has_time_conditions()
+
+    @staticmethod
+    def _hash(*parts) -> str:
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def conditional_get(compute_etag: Callable[..., str]):
+    """
+    Decorates a GET view to answer If-None-Match requests with 304 Not Modified.
+    The ETag is computed with the view arguments before the view runs, so a write made
+    while the view runs can only make the response newer than its tag, never older.
+    Goes between the jwt_required and the api.validate decorators.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(**kwargs)
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+                response.set_etag(etag)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+
+        return wrapper
+
+    return decorator
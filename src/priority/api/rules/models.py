@@ -12,7 +12,9 @@ class Rule(db.Model):
     user_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey(User.id), index=True)
     user: so.Mapped[User] = so.relationship(back_populates='rules')
 
-    conditions: so.Mapped[List['Condition']] = so.relationship(back_populates='rule', cascade='all, delete-orphan')
+    conditions: so.Mapped[List['Condition']] = so.relationship(
+        back_populates='rule', cascade='all, delete-orphan', lazy='selectin'
+    )
 
     def __repr__(self):
         return f'<Rule {self.name}>'
@@ -3,15 +3,17 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from spectree import Response
 
 from .schemas import RuleCreateInput, RuleUpdateInput, RuleResponse, RulesListResponse
-from src.priority.api import rule_service
+from src.priority.api import rule_service, etag_service
+from src.priority.api.etags import conditional_get
 from src.priority.extensions import api
 
 rules = Blueprint("rules", __name__, url_prefix="/api/rules")
 
 @rules.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda: etag_service.rules_etag(int(get_jwt_identity())))
 @api.validate(
-    resp=Response(HTTP_200=RulesListResponse, HTTP_401=None),
+    resp=Response(HTTP_200=RulesListResponse, HTTP_304=None, HTTP_401=None),
     security=[{'jwt': []}],
     tags=['rules']
 )
@@ -20,6 +22,7 @@ def get_rules():
 
     Retrieves a list of all prioritization rules and their associated
     conditions for the currently authenticated user.
+    The response has an ETag, unchanged rules are answered with 304 to an If-None-Match request.
     """
     user_id = int(get_jwt_identity())
 
@@ -58,8 +61,9 @@ def create_rule():
 
 @rules.route('/<int:rule_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda rule_id: etag_service.rules_etag(int(get_jwt_identity()), rule_id))
 @api.validate(
-    resp=Response(HTTP_200=RuleResponse, HTTP_401=None),
+    resp=Response(HTTP_200=RuleResponse, HTTP_304=None, HTTP_401=None),
     security=[{'jwt': []}],
     tags=['rules']
 )
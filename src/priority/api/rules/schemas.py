@@ -1,6 +1,6 @@
 from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict, model_validator
-from src.priority.utils import parse_timedelta
+from src.priority.durations import parse_duration
 
 ALLOWED_FIELDS = Literal["category", "tag", "duration", "deadline", "created_at"]
 ALLOWED_OPERATORS = Literal["equals", "greater_than", "less_than"]
@@ -16,7 +16,7 @@ class ConditionCreateInput(BaseModel):
     def validate_value_for_field(self):
         """Validate that the condition value has a compatible type with the task field"""
         if self.field in FIELDS_REQUIRING_TIMEDELTA_VALUE:
-            parse_timedelta(self.value)
+            parse_duration(self.value)
         return self
 
 class ConditionResponse(BaseModel):
@@ -1,4 +1,6 @@
-from flask import abort
+from typing import List, Optional, TYPE_CHECKING
+
+from flask import abort, current_app
 import sqlalchemy as sa
 
 from .models import Rule, Condition
@@ -6,6 +8,10 @@ from .schemas import RuleCreateInput, RuleUpdateInput
 from src.priority.api.users.models import User
 from src.priority.extensions import db
 from src.priority.errors import bad_request
+from src.priority.core import CompiledRuleSetCache
+
+if TYPE_CHECKING:
+    from src.priority.api.tasks.scores import TaskScoreService
 
 
 class RuleService:
@@ -13,8 +19,17 @@ class RuleService:
     Handles all business logic and database interactions for Rules.
     Only allows for operations of objects related to a specific user,
     passed as a user_id argument to all methods.
+    Every rule write bumps the user's rules version and invalidates
+    the user's compiled rules in the cache. If a task score service is given and
+    tasks are listed by their stored scores (the 'materialized' scoring backend),
+    the stored scores of the tasks the written rule could apply to are updated.
     """
 
+    def __init__(self, ruleset_cache: Optional[CompiledRuleSetCache] = None,
+                 task_score_service: Optional['TaskScoreService'] = None):
+        self.ruleset_cache = ruleset_cache
+        self.task_score_service = task_score_service
+
     def get_all(self, user_id: int):
         """Get all rules for user."""
         user = db.get_or_404(User, user_id)
@@ -37,8 +52,11 @@ class RuleService:
             condition.rule = rule
 
         db.session.add(rule)
+        rules_version = self._bump_rules_version(user_id)
         db.session.commit()
 
+        self._update_task_scores(user_id, rules_version, [rule.conditions])
+
         return rule
 
     def get(self, user_id: int, rule_id: int):
@@ -61,6 +79,7 @@ class RuleService:
     def update(self, user_id: int, rule_id: int, rule_data: RuleUpdateInput):
         """Updates an existing rule. Conditions will be replaced if specified."""
         rule = self.get(user_id, rule_id)
+        old_conditions = self._copy_conditions(rule)
 
         update_data = rule_data.model_dump(exclude_unset=True)
 
@@ -78,13 +97,47 @@ class RuleService:
                 setattr(rule, key, value)
 
         db.session.add(rule)
+        rules_version = self._bump_rules_version(user_id)
         db.session.commit()
 
+        self._update_task_scores(user_id, rules_version, [old_conditions, rule.conditions])
+
         return rule
 
     def delete(self, user_id, rule_id: int):
         """Deletes a rule for the user."""
         rule = self.get(user_id, rule_id)
+        old_conditions = self._copy_conditions(rule)
 
         db.session.delete(rule)
+        rules_version = self._bump_rules_version(user_id)
         db.session.commit()
+
+        self._update_task_scores(user_id, rules_version, [old_conditions])
+
+    def _bump_rules_version(self, user_id: int) -> int:
+        """Marks the user's compiled rules as stale for all processes. Returns the new rules version."""
+        rules_version = db.session.scalar(
+            sa.update(User)
+            .where(User.id == user_id)
+            .values(rules_version=User.rules_version + 1)
+            .returning(User.rules_version)
+        )
+
+        if self.ruleset_cache is not None:
+            self.ruleset_cache.invalidate(user_id)
+
+        return rules_version
+
+    def _update_task_scores(self, user_id: int, rules_version: int, changed_rules_conditions: List[List[Condition]]):
+        """Updates the stored task scores affected by the rule write, if the scoring backend reads them."""
+        scoring_backend = current_app.config.get('PRIORITY_SCORING_BACKEND')
+        if self.task_score_service is not None and scoring_backend == 'materialized':
+            self.task_score_service.rules_changed(user_id, rules_version, changed_rules_conditions)
+
+    def _copy_conditions(self, rule: Rule) -> List[Condition]:
+        """Copies the rule conditions before they are changed or deleted."""
+        return [
+            Condition(field=condition.field, operator=condition.operator, value=condition.value)
+            for condition in rule.conditions
+        ]
@@ -0,0 +1,83 @@
+import time
+from datetime import timedelta
+
+import click
+from flask.cli import AppGroup
+
+from src.priority.api import priority_calculator, task_score_service, task_import_service
+from src.priority.api.users.models import User
+from src.priority.core import ScoreRefreshScheduler
+from src.priority.extensions import db
+from .imports import IMPORT_CHUNK_SIZE, IMPORT_READERS
+
+tasks_cli = AppGroup('tasks', help='Task maintenance commands.')
+
+
+@tasks_cli.command('refresh-scores')
+def refresh_scores():
+    """Recompute the stored priority scores that are no longer valid.
+
+    Scores become stale when the user's rules change or when time passes
+    the next instant at which a task's deadline or created_at conditions flip.
+    """
+    refreshed = task_score_service.refresh_all_stale()
+    click.echo(f'Refreshed {refreshed} task scores.')
+
+
+@tasks_cli.command('schedule-scores')
+@click.option('--horizon', default=60, show_default=True, help='Seconds of transitions loaded at once.')
+def schedule_scores(horizon):
+    """Refresh stored priority scores exactly when they change.
+
+    Loads the score transitions of the next horizon seconds into a priority queue
+    and sleeps until the earliest one is due. Stale scores of tasks written in the
+    meantime are refreshed when the next horizon is loaded.
+    """
+    scheduler = ScoreRefreshScheduler()
+
+    while True:
+        now = priority_calculator.clock()
+        until = now + timedelta(seconds=horizon)
+        task_score_service.refresh_all_stale()
+        task_score_service.schedule_transitions(scheduler, until)
+
+        while True:
+            next_due = scheduler.next_due()
+            wake_at = until if next_due is None or next_due > until else next_due
+            time.sleep(max((wake_at - priority_calculator.clock()).total_seconds(), 0))
+
+            if wake_at == until:
+                break
+
+            refreshed = task_score_service.refresh_due(scheduler, priority_calculator.clock(), until)
+            click.echo(f'Refreshed {refreshed} task scores.')
+
+
+@tasks_cli.command('import')
+@click.argument('user_id', type=int)
+@click.argument('file', type=click.File('r', encoding='utf-8', lazy=False))
+@click.option('--format', 'import_format', type=click.Choice(sorted(IMPORT_READERS)),
+              help='File format, guessed from the file extension by default.')
+@click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True, help='Tasks inserted per transaction.')
+def import_tasks(user_id, file, import_format, chunk_size):
+    """Import tasks for a user from an NDJSON or CSV file.
+
+    NDJSON files have one task object per line. CSV files have a header row
+    of task fields, and tags separated by semicolons. Use - to read from stdin.
+    """
+    if db.session.get(User, user_id) is None:
+        raise click.BadParameter(f'User {user_id} not found.', param_hint='USER_ID')
+
+    if import_format is None:
+        import_format = 'csv' if file.name.endswith('.csv') else 'ndjson'
+
+    def report_progress(result):
+        click.echo(f'Imported {result.imported} tasks, {result.failed} failed.')
+
+    result = task_import_service.import_tasks(
+        user_id, IMPORT_READERS[import_format](file), chunk_size, report_progress
+    )
+
+    for error in result.errors:
+        click.echo(f'Line {error.line}: {error.message}', err=True)
+    click.echo(f'Done, imported {result.imported} tasks, {result.failed} failed.')
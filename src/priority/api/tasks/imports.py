@@ -0,0 +1,109 @@
+import csv
+import json
+from itertools import islice
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from src.priority.extensions import db
+from .schemas import TaskCreateInput, TaskImportError, TasksImportResponse
+from .service import TaskService
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_IMPORT_ERRORS = 100
+CSV_TAGS_SEPARATOR = ';'
+
+ImportRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+def read_ndjson(stream: IO[str]) -> Iterator[ImportRow]:
+    """Reads one task object per line, skipping blank lines."""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield line_number, None, f'Invalid JSON: {error}'
+            continue
+
+        if not isinstance(row, dict):
+            yield line_number, None, 'Expected a JSON object'
+            continue
+        yield line_number, row, None
+
+
+def read_csv(stream: IO[str]) -> Iterator[ImportRow]:
+    """
+    Reads tasks from CSV rows with a header of task field names.
+    Empty cells are left out, and tags are separated by semicolons.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        task_row = {field: value for field, value in row.items() if field and value not in (None, '')}
+        if 'tags' in task_row:
+            task_row['tags'] = [tag.strip() for tag in task_row['tags'].split(CSV_TAGS_SEPARATOR) if tag.strip()]
+        yield reader.line_num, task_row, None
+
+
+IMPORT_READERS: Dict[str, Callable[[IO[str]], Iterator[ImportRow]]] = {
+    'ndjson': read_ndjson,
+    'csv': read_csv,
+}
+
+
+class TaskImportService:
+    """
+    Imports large numbers of tasks incrementally.
+    Rows are read, validated and inserted in fixed size chunks, each committed in its own transaction,
+    so a failure only loses the current chunk and memory does not grow with the file size.
+    Invalid rows are skipped and reported with their line numbers.
+    """
+
+    def __init__(self, task_service: TaskService):
+        self.task_service = task_service
+
+    def import_tasks(self, user_id: int, rows: Iterable[ImportRow], chunk_size: int = IMPORT_CHUNK_SIZE,
+                     on_progress: Optional[Callable[[TasksImportResponse], None]] = None) -> TasksImportResponse:
+        """Validates and inserts the rows for the user. The progress callback is called after each chunk."""
+        result = TasksImportResponse()
+        rows = iter(rows)
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return result
+
+            tasks_data = self._validate_chunk(chunk, result)
+            if tasks_data:
+                self.task_service.insert_many(user_id, tasks_data)
+                db.session.commit()
+                db.session.expunge_all()
+                result.imported += len(tasks_data)
+
+            if on_progress is not None:
+                on_progress(result)
+
+    def _validate_chunk(self, chunk: List[ImportRow], result: TasksImportResponse) -> List[TaskCreateInput]:
+        """Validates the rows of a chunk, recording the errors of invalid ones in the result."""
+        tasks_data = []
+        for line_number, row, error in chunk:
+            if error is None:
+                try:
+                    tasks_data.append(TaskCreateInput.model_validate(row))
+                    continue
+                except ValidationError as validation_error:
+                    error = self._format_validation_error(validation_error)
+
+            result.failed += 1
+            if len(result.errors) < MAX_REPORTED_IMPORT_ERRORS:
+                result.errors.append(TaskImportError(line=line_number, message=error))
+
+        return tasks_data
+
+    @staticmethod
+    def _format_validation_error(error: ValidationError) -> str:
+        """Joins the validation errors of a row into one message."""
+        return '; '.join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()
+        )
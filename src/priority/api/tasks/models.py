@@ -34,6 +34,17 @@ class Task(db.Model):
 
     tags: so.Mapped[List['Tag']] = so.relationship(secondary=task_tags, back_populates='tasks')
 
+    # Materialized priority score, valid while score_rules_version matches
+    # the user's rules version and score_valid_until has not passed.
+    priority_score: so.Mapped[int] = so.mapped_column(default=0, server_default='0')
+    score_computed_at: so.Mapped[Optional[datetime]] = so.mapped_column(sa.DateTime(timezone=True))
+    score_rules_version: so.Mapped[Optional[int]] = so.mapped_column()
+    score_valid_until: so.Mapped[Optional[datetime]] = so.mapped_column(sa.DateTime(timezone=True), index=True)
+
+    __table_args__ = (
+        sa.Index('ix_task_user_id_priority_score', 'user_id', sa.text('priority_score DESC'), 'id'),
+    )
+
     def __repr__(self):
         return f'<Task {self.title}>'
 
@@ -47,6 +58,10 @@ class Category(db.Model):
 
     tasks: so.Mapped[List[Task]] = so.relationship(back_populates='category')
 
+    __table_args__ = (
+        sa.UniqueConstraint('user_id', 'name', name='uq_category_user_id_name'),
+    )
+
     def __repr__(self):
         return f'<Category {self.name}>'
 
@@ -60,5 +75,9 @@ class Tag(db.Model):
 
     tasks: so.Mapped[List['Task']] = so.relationship(secondary=task_tags, back_populates='tags')
 
+    __table_args__ = (
+        sa.UniqueConstraint('user_id', 'name', name='uq_tag_user_id_name'),
+    )
+
     def __repr__(self):
         return f'<Tag {self.name}>'
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
+
+from flask import abort
+
+from .models import Task
+from .read_model import TaskRecord
+from .schemas import TasksFilterParams
+
+SortKey = Tuple[Any, int]
+
+
+def task_sort_key(task: Union[Task, TaskRecord], order_by: str) -> SortKey:
+    """Returns the (sort value, id) pair which orders the task in the listing."""
+    if order_by == 'priority_score':
+        return task.priority_score, task.id
+    return getattr(task, order_by), task.id
+
+
+def encode_cursor(order_by: str, sort_key: SortKey) -> str:
+    """Encodes the sort key of the last task in a page as an opaque cursor."""
+    value, task_id = sort_key
+    if isinstance(value, datetime):
+        value = value.isoformat()
+
+    payload = json.dumps([order_by, value, task_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, order_by: str) -> SortKey:
+    """
+    Decodes a cursor into the sort key after which the next page starts.
+    Throws HTTPException if the cursor is malformed or was created for another ordering.
+    """
+    try:
+        cursor_order_by, value, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if order_by in ('deadline', 'created_at') and value is not None:
+            value = datetime.fromisoformat(value)
+    except (binascii.Error, ValueError, TypeError):
+        abort(400, description="Invalid cursor")
+
+    if cursor_order_by != order_by or not _is_int(task_id) or not _is_sort_value(value, order_by):
+        abort(400, description="Invalid cursor")
+
+    return value, task_id
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_sort_value(value: Any, order_by: str) -> bool:
+    """Checks the type of a decoded sort value, only deadlines can be null."""
+    if order_by == 'priority_score':
+        return _is_int(value)
+    if order_by == 'deadline' and value is None:
+        return True
+    return isinstance(value, datetime)
+
+
+def next_page_cursor(tasks: List[Union[Task, TaskRecord]], filters: TasksFilterParams) -> Optional[str]:
+    """Returns the cursor of the next page, or None if the page is not full."""
+    if len(tasks) < filters.limit:
+        return None
+
+    return encode_cursor(filters.order_by, task_sort_key(tasks[-1], filters.order_by))
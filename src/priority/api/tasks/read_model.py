@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from .models import Task, Category, Tag, task_tags
+
+
+@dataclass(slots=True)
+class CategoryRecord:
+    id: int
+    name: str
+
+
+@dataclass(slots=True)
+class TagRecord:
+    id: int
+    name: str
+
+
+@dataclass(slots=True)
+class TaskRecord:
+    """
+    Read only task with the fields of a TaskResponse, used for listings instead of ORM objects.
+    It has the attributes the priority calculator reads, so it can be scored like a Task.
+    """
+    id: int
+    title: str
+    completed: bool
+    duration: Optional[timedelta]
+    deadline: Optional[datetime]
+    created_at: datetime
+    category: Optional[CategoryRecord]
+    tags: Tuple[TagRecord, ...]
+    priority_score: int = 0
+
+
+def task_records_query() -> sa.Select:
+    """
+    Selects one row per task with the task columns, the category and the aggregated tag ids and names.
+    Filters and ordering on task columns can be added to it like to a Task query.
+    """
+    tag_ids = sa.func.array_agg(postgresql.aggregate_order_by(Tag.id, Tag.id)).filter(Tag.id.is_not(None))
+    tag_names = sa.func.array_agg(postgresql.aggregate_order_by(Tag.name, Tag.id)).filter(Tag.id.is_not(None))
+
+    return (
+        sa.select(
+            Task.id, Task.title, Task.completed, Task.duration, Task.deadline, Task.created_at,
+            Category.id.label('category_id'), Category.name.label('category_name'),
+            tag_ids.label('tag_ids'), tag_names.label('tag_names'),
+        )
+        .select_from(Task)
+        .outerjoin(Category, Task.category_id == Category.id)
+        .outerjoin(task_tags, task_tags.c.task_id == Task.id)
+        .outerjoin(Tag, task_tags.c.tag_id == Tag.id)
+        .group_by(Task.id, Category.id)
+    )
+
+
+def to_task_record(row: sa.Row, priority_score: int = 0) -> TaskRecord:
+    """Maps a row of the task records query to a TaskRecord."""
+    category = None
+    if row.category_id is not None:
+        category = CategoryRecord(row.category_id, row.category_name)
+
+    tags = ()
+    if row.tag_ids:
+        tags = tuple(TagRecord(tag_id, tag_name) for tag_id, tag_name in zip(row.tag_ids, row.tag_names))
+
+    return TaskRecord(
+        id=row.id,
+        title=row.title,
+        completed=row.completed,
+        duration=row.duration,
+        deadline=row.deadline,
+        created_at=row.created_at,
+        category=category,
+        tags=tags,
+        priority_score=priority_score,
+    )
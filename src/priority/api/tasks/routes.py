@@ -1,19 +1,29 @@
-from flask import request, jsonify, Blueprint
+import io
+
+from flask import request, abort, Blueprint, Response as FlaskResponse, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from spectree import Response
 
-from .schemas import TaskCreateInput, TaskUpdateInput, TaskResponse, TasksListResponse, TasksFilterParams
+from .schemas import (
+    TaskCreateInput, TaskUpdateInput, TaskResponse, TasksListResponse, TasksFilterParams,
+    TasksBulkCreateInput, TasksBulkResponse, TasksBulkSelection, TasksBulkUpdateInput, TasksBulkDeleteResponse,
+    TasksImportResponse
+)
+from .pagination import next_page_cursor
+from .imports import IMPORT_READERS
 
-from src.priority.api import task_service
+from src.priority.api import task_service, task_import_service, etag_service
+from src.priority.api.etags import conditional_get
 from src.priority.extensions import api
 
 tasks = Blueprint("tasks", __name__, url_prefix="/api/tasks")
 
 @tasks.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda: etag_service.tasks_etag(int(get_jwt_identity()), sorted(request.args.items(multi=True))))
 @api.validate(
     query=TasksFilterParams,
-    resp=Response(HTTP_200=TasksListResponse, HTTP_401=None),
+    resp=Response(HTTP_200=TasksListResponse, HTTP_304=None, HTTP_401=None),
     security=[{'jwt': []}],
     tags=['tasks']
 )
@@ -22,24 +32,50 @@ def get_tasks():
 
     Retrieves a list of all tasks associated with the authenticated user.
     The tasks' priority scores are calculated based on the user' rules.
-    The list can be filtered by completed status and
+    The list can be filtered by completed status and minimal priority score, and
     sorted by priority score, creation date, or deadline with the query parameters.
+    The tasks are returned in pages of the given limit. When there may be more tasks,
+    next_cursor is returned, which can be passed as the cursor parameter to get the next page.
+    The response has an ETag, an unchanged list is answered with 304 to an If-None-Match request.
     """
     user_id = int(get_jwt_identity())
 
     validated_query = request.context.query
 
     tasks = task_service.get_filtered(user_id, validated_query)
+    next_cursor = next_page_cursor(tasks, validated_query)
+
+    response_model = TasksListResponse.model_validate({'tasks': tasks, 'next_cursor': next_cursor})
 
-    response_model = TasksListResponse.model_validate({'tasks': tasks})
+    return response_model, 200
 
-    return jsonify(response_model.model_dump(mode='json')), 200
+@tasks.route('/export', methods=['GET'])
+@jwt_required()
+@api.validate(
+    resp=Response(HTTP_401=None),
+    security=[{'jwt': []}],
+    tags=['tasks']
+)
+def export_tasks():
+    """Export all tasks as newline-delimited JSON.
+
+    Streams all tasks of the authenticated user with their priority scores,
+    one JSON task object per line, ordered by id.
+    The tasks are read and sent in chunks, so accounts of any size can be exported.
+    """
+    user_id = int(get_jwt_identity())
+
+    def generate():
+        for task in task_service.export(user_id):
+            yield TaskResponse.model_validate(task).model_dump_json() + '\n'
+
+    return FlaskResponse(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @tasks.route('/', methods=['POST'])
 @jwt_required()
 @api.validate(
     json=TaskCreateInput,
-    resp=Response(HTTP_200=TaskResponse, HTTP_401=None),
+    resp=Response(HTTP_201=TaskResponse, HTTP_401=None),
     security=[{'jwt': []}],
     tags=['tasks']
 )
@@ -56,12 +92,140 @@ def create_task():
 
     response_model = TaskResponse.model_validate(task)
 
-    return jsonify(response_model.model_dump(mode='json')), 201
+    return response_model, 201
+
+@tasks.route('/bulk', methods=['POST'])
+@jwt_required()
+@api.validate(
+    json=TasksBulkCreateInput,
+    resp=Response(HTTP_201=TasksBulkResponse, HTTP_401=None),
+    security=[{'jwt': []}],
+    tags=['tasks']
+)
+def create_tasks_bulk():
+    """Create many tasks at once.
+
+    Creates up to 1000 tasks for the authenticated user in a single transaction.
+    Categories and tags can be automatically created by providing new names in the request.
+    The created tasks are returned in the order of the request.
+    """
+    user_id = int(get_jwt_identity())
+    validated_data = request.context.json
+
+    tasks = task_service.create_many(user_id, validated_data.tasks)
+
+    response_model = TasksBulkResponse.model_validate({'tasks': tasks})
+
+    return response_model, 201
+
+IMPORT_MIMETYPES = {
+    'application/x-ndjson': 'ndjson',
+    'text/csv': 'csv',
+}
+
+@tasks.route('/import', methods=['POST'])
+@jwt_required()
+@api.validate(
+    resp=Response(HTTP_200=TasksImportResponse, HTTP_401=None, HTTP_415=None),
+    security=[{'jwt': []}],
+    tags=['tasks']
+)
+def import_tasks():
+    """Import tasks from an NDJSON or CSV upload.
+
+    The request body is read incrementally as newline-delimited JSON task objects
+    (Content-Type application/x-ndjson), or as CSV with a header row of task fields
+    and semicolon separated tags (Content-Type text/csv).
+    Tasks are validated and inserted in chunks, each committed separately.
+    Invalid rows are skipped, and returned with their line numbers.
+    """
+    user_id = int(get_jwt_identity())
+
+    import_format = IMPORT_MIMETYPES.get(request.mimetype)
+    if import_format is None:
+        abort(415, description="Upload tasks as application/x-ndjson or text/csv")
+
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    result = task_import_service.import_tasks(user_id, IMPORT_READERS[import_format](stream))
+
+    return result, 200
+
+@tasks.route('/bulk', methods=['PATCH'])
+@jwt_required()
+@api.validate(
+    json=TasksBulkUpdateInput,
+    resp=Response(HTTP_200=TasksBulkResponse, HTTP_401=None),
+    security=[{'jwt': []}],
+    tags=['tasks']
+)
+def update_tasks_bulk():
+    """Update many tasks at once.
+
+    Updates the given fields of all the current user's tasks matching the selection.
+    Tasks can be selected by a list of ids, and by completed status, category and tag.
+    A new category will be automatically created.
+    The updated tasks are returned with their priority scores.
+    """
+    user_id = int(get_jwt_identity())
+    validated_data = request.context.json
+
+    tasks = task_service.update_many(user_id, validated_data.selection, validated_data.changes)
+
+    response_model = TasksBulkResponse.model_validate({'tasks': tasks})
+
+    return response_model, 200
+
+@tasks.route('/bulk/complete', methods=['POST'])
+@jwt_required()
+@api.validate(
+    json=TasksBulkSelection,
+    resp=Response(HTTP_200=TasksBulkResponse, HTTP_401=None),
+    security=[{'jwt': []}],
+    tags=['tasks']
+)
+def complete_tasks_bulk():
+    """Mark many tasks as complete.
+
+    Sets the 'completed' status to true for all the current user's tasks matching the selection,
+    for example all tasks tagged 'sprint-12'.
+    """
+    user_id = int(get_jwt_identity())
+    validated_data = request.context.json
+
+    tasks = task_service.complete_many(user_id, validated_data)
+
+    response_model = TasksBulkResponse.model_validate({'tasks': tasks})
+
+    return response_model, 200
+
+@tasks.route('/bulk/delete', methods=['POST'])
+@jwt_required()
+@api.validate(
+    json=TasksBulkSelection,
+    resp=Response(HTTP_200=TasksBulkDeleteResponse, HTTP_401=None),
+    security=[{'jwt': []}],
+    tags=['tasks']
+)
+def delete_tasks_bulk():
+    """Delete many tasks at once.
+
+    Permanently deletes all the current user's tasks matching the selection,
+    and returns the number of deleted tasks.
+    """
+    user_id = int(get_jwt_identity())
+    validated_data = request.context.json
+
+    deleted = task_service.delete_many(user_id, validated_data)
+
+    response_model = TasksBulkDeleteResponse(deleted=deleted)
+
+    return response_model, 200
 
 @tasks.route('/<int:task_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda task_id: etag_service.tasks_etag(int(get_jwt_identity()), task_id))
 @api.validate(
-    resp=Response(HTTP_200=TaskResponse, HTTP_401=None),
+    resp=Response(HTTP_200=TaskResponse, HTTP_304=None, HTTP_401=None),
     security=[{'jwt': []}],
     tags=['tasks']
 )
@@ -77,7 +241,7 @@ def get_task(task_id):
     task = task_service.get_with_priority_score(user_id, task_id)
     response_model = TaskResponse.model_validate(task)
 
-    return jsonify(response_model.model_dump(mode='json')), 200
+    return response_model, 200
 
 @tasks.route('/<int:task_id>', methods=['PUT', 'PATCH'])
 @jwt_required()
@@ -102,7 +266,7 @@ def update_task(task_id):
 
     response_model = TaskResponse.model_validate(task)
 
-    return jsonify(response_model.model_dump(mode='json')), 201
+    return response_model, 201
 
 @tasks.route('/<int:task_id>/complete', methods=['POST'])
 @jwt_required()
@@ -122,7 +286,7 @@ def complete_task(task_id):
 
     response_model = TaskResponse.model_validate(task)
 
-    return jsonify(response_model.model_dump(mode='json')), 200
+    return response_model, 200
 
 @tasks.route('/<int:task_id>', methods=['DELETE'])
 @jwt_required()
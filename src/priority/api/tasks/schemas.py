@@ -1,8 +1,23 @@
-from datetime import timedelta, datetime
-from typing import List, Optional, Literal
-from pydantic import BaseModel, ConfigDict, Field
+from datetime import timedelta, datetime, timezone
+from typing import Annotated, List, Optional, Literal
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, field_validator, model_validator
 
 TASK_ORDER_BY = Literal['priority_score', 'created_at', 'deadline']
+DEFAULT_TASKS_PAGE_SIZE = 100
+MAX_TASKS_PAGE_SIZE = 500
+MAX_BULK_TASKS = 1000
+
+
+def _to_utc(value: datetime) -> datetime:
+    """Converts a datetime to UTC, a naive one is taken as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+# Input datetimes are compared with the aware ones loaded from the db when tasks are scored before they are stored.
+UtcDatetime = Annotated[datetime, AfterValidator(_to_utc)]
+
 
 class TagResponse(BaseModel):
     id: int
@@ -19,15 +34,18 @@ class CategoryResponse(BaseModel):
 class TasksFilterParams(BaseModel):
     completed: Optional[bool] = None
     order_by: Optional[TASK_ORDER_BY] = 'priority_score'
+    min_priority_score: Optional[int] = None
+    limit: int = Field(DEFAULT_TASKS_PAGE_SIZE, ge=1, le=MAX_TASKS_PAGE_SIZE)
+    cursor: Optional[str] = None
 
 
 class TaskCreateInput(BaseModel):
-    title: str
+    title: str = Field(..., max_length=140)
     completed: Optional[bool] = False
     duration: Optional[timedelta] = None
-    deadline: Optional[datetime] = None
-    category: Optional[str] = None
-    tags: Optional[List[str]] = []
+    deadline: Optional[UtcDatetime] = None
+    category: Optional[str] = Field(None, max_length=50)
+    tags: Optional[List[Annotated[str, Field(max_length=50)]]] = []
 
     class Config:
         json_schema_extra = {
@@ -42,11 +60,84 @@ class TaskCreateInput(BaseModel):
         }
 
 
+class TasksBulkCreateInput(BaseModel):
+    tasks: List[TaskCreateInput] = Field(..., min_length=1, max_length=MAX_BULK_TASKS)
+
+    class Config:
+        json_schema_extra = {
+            'example': {
+                'tasks': [
+                    {
+                        'title': 'Finish project',
+                        'duration': 'PT6H30M',
+                        'deadline': '2025-09-09 15:30',
+                        'category': 'work',
+                        'tags': ['urgent', 'important']
+                    },
+                    {
+                        'title': 'Buy groceries',
+                        'category': 'personal',
+                    }
+                ]
+            }
+        }
+
+
+class TasksBulkSelection(BaseModel):
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=MAX_BULK_TASKS)
+    completed: Optional[bool] = None
+    category: Optional[str] = None
+    tag: Optional[str] = None
+
+    @model_validator(mode='after')
+    def validate_has_criteria(self):
+        """Validate that the selection doesn't select all tasks by accident"""
+        if self.ids is None and self.completed is None and self.category is None and self.tag is None:
+            raise ValueError('Select tasks by ids, completed, category or tag')
+        return self
+
+    class Config:
+        json_schema_extra = {
+            'example': {
+                'tag': 'sprint-12',
+                'completed': False,
+            }
+        }
+
+
+class TasksBulkChanges(BaseModel):
+    completed: Optional[bool] = None
+    duration: Optional[timedelta] = None
+    deadline: Optional[UtcDatetime] = None
+    category: Optional[str] = None
+
+    @field_validator('completed')
+    @classmethod
+    def validate_completed_not_null(cls, completed):
+        """Validate that completed is not null, it can only be omitted to keep it unchanged"""
+        if completed is None:
+            raise ValueError('completed can not be null')
+        return completed
+
+
+class TasksBulkUpdateInput(BaseModel):
+    selection: TasksBulkSelection
+    changes: TasksBulkChanges
+
+    class Config:
+        json_schema_extra = {
+            'example': {
+                'selection': {'ids': [1, 2, 3]},
+                'changes': {'deadline': '2025-09-09 15:30', 'category': 'work'},
+            }
+        }
+
+
 class TaskUpdateInput(BaseModel):
     title: str = None
     completed: Optional[bool] = False
     duration: Optional[timedelta] = None
-    deadline: Optional[datetime] = None
+    deadline: Optional[UtcDatetime] = None
     category: Optional[str] = None
     tags: Optional[List[str]] = []
 
@@ -67,3 +158,23 @@ class TaskResponse(BaseModel):
 
 class TasksListResponse(BaseModel):
     tasks: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+
+class TasksBulkResponse(BaseModel):
+    tasks: List[TaskResponse]
+
+
+class TasksBulkDeleteResponse(BaseModel):
+    deleted: int
+
+
+class TaskImportError(BaseModel):
+    line: int
+    message: str
+
+
+class TasksImportResponse(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[TaskImportError] = []
@@ -0,0 +1,182 @@
+from datetime import datetime
+from itertools import groupby
+from typing import Iterable, List, Optional
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+from src.priority.extensions import db
+from src.priority.api.rules.models import Condition
+from src.priority.api.users.models import User
+from src.priority.core import (
+    PriorityCalculator, CompiledRuleSet, SqlScoreBuilder, ScoreRefreshScheduler, BatchScorer, TaskColumns,
+    ScoringContext, TIME_FIELDS
+)
+from .models import Task
+
+REFRESH_CHUNK_SIZE = 1000
+
+
+class TaskScoreService:
+    """
+    Maintains the materialized priority scores stored on tasks.
+    A stored score is valid while the task's score_rules_version matches
+    the user's rules version and its score_valid_until instant has not passed.
+    """
+
+    def __init__(self, priority_calculator: PriorityCalculator, sql_score_builder: Optional[SqlScoreBuilder] = None,
+                 batch_scorer: Optional[BatchScorer] = None):
+        self.priority_calculator = priority_calculator
+        self.sql_score_builder = sql_score_builder or SqlScoreBuilder()
+        self.batch_scorer = batch_scorer or BatchScorer()
+
+    def store(self, task: Task, user: User, compiled_rules: Optional[CompiledRuleSet] = None,
+              now: Optional[datetime] = None):
+        """Computes the task score and the instant until which it is valid, without committing."""
+        if compiled_rules is None:
+            compiled_rules = self.priority_calculator.compile_user_rules(user)
+        now = now or self.priority_calculator.clock()
+
+        task.priority_score = self.priority_calculator.calculate_task_score(task, compiled_rules, ScoringContext(now))
+        task.score_computed_at = now
+        task.score_rules_version = user.rules_version
+        task.score_valid_until = self.priority_calculator.next_score_change_at(task, compiled_rules, now)
+
+    def store_many(self, tasks: List[Task], user: User, compiled_rules: CompiledRuleSet, now: datetime):
+        """Computes the scores and validity instants of many tasks at once, without committing."""
+        columns = TaskColumns(tasks, compiled_rules)
+        scores = self.batch_scorer.score_columns(columns, compiled_rules, now)
+        valid_until = self.batch_scorer.next_change_at(columns, compiled_rules, now)
+
+        for task, score, task_valid_until in zip(tasks, scores.tolist(), valid_until):
+            task.priority_score = score
+            task.score_computed_at = now
+            task.score_rules_version = user.rules_version
+            task.score_valid_until = task_valid_until
+
+    def refresh_stale(self, user: User, compiled_rules: Optional[CompiledRuleSet] = None,
+                      now: Optional[datetime] = None) -> int:
+        """Recomputes and commits the user's task scores that are no longer valid at now. Returns their count."""
+        if compiled_rules is None:
+            compiled_rules = self.priority_calculator.compile_user_rules(user)
+        now = now or self.priority_calculator.clock()
+
+        stale = sa.or_(
+            Task.score_rules_version.is_distinct_from(user.rules_version),
+            Task.score_valid_until <= now,
+        )
+        return self._refresh(user, compiled_rules, stale, now)
+
+    def refresh_all_stale(self) -> int:
+        """Recomputes the stale task scores of all users. Returns the number of refreshed tasks."""
+        now = self.priority_calculator.clock()
+        user_ids = db.session.scalars(
+            sa.select(Task.user_id).distinct()
+            .join(User, Task.user_id == User.id)
+            .where(sa.or_(
+                Task.score_rules_version.is_distinct_from(User.rules_version),
+                Task.score_valid_until <= now,
+            ))
+        ).all()
+
+        refreshed = 0
+        for user_id in user_ids:
+            refreshed += self.refresh_stale(db.session.get(User, user_id), now=now)
+        return refreshed
+
+    def schedule_transitions(self, scheduler: ScoreRefreshScheduler, until: datetime) -> int:
+        """Schedules the stored score transitions of all tasks up to the given instant. Returns their count."""
+        transitions = db.session.execute(
+            sa.select(Task.id, Task.score_valid_until).where(Task.score_valid_until <= until)
+        ).all()
+
+        for task_id, valid_until in transitions:
+            scheduler.schedule(task_id, valid_until)
+        return len(transitions)
+
+    def refresh_due(self, scheduler: ScoreRefreshScheduler, now: datetime, until: datetime) -> int:
+        """
+        Recomputes the scores of the tasks whose scheduled transition is due,
+        and schedules their next transition if it is before the given instant.
+        Returns the number of refreshed tasks.
+        """
+        task_ids = scheduler.pop_due(now)
+        if not task_ids:
+            return 0
+
+        tasks = db.session.scalars(
+            sa.select(Task)
+            .where(Task.id.in_(task_ids))
+            .options(so.joinedload(Task.category), so.joinedload(Task.tags))
+            .order_by(Task.user_id)
+        ).unique().all()
+
+        for _, user_tasks in groupby(tasks, key=lambda task: task.user_id):
+            user_tasks = list(user_tasks)
+            user = user_tasks[0].user
+            compiled_rules = self.priority_calculator.compile_user_rules(user)
+            self.store_many(user_tasks, user, compiled_rules, now)
+            for task in user_tasks:
+                if task.score_valid_until is not None and task.score_valid_until <= until:
+                    scheduler.schedule(task.id, task.score_valid_until)
+
+        db.session.commit()
+        return len(tasks)
+
+    def rules_changed(self, user_id: int, rules_version: int, changed_rules_conditions: Iterable[List[Condition]]) -> int:
+        """
+        Updates the stored scores after a rule write that bumped the user's rules version.
+        The changed rules conditions are the old and new conditions of the written rule.
+        Only tasks matching the category, tag and duration conditions of one of them are rescored.
+        The other tasks, scored with the previous rules version, are moved to the new version as they are.
+        Returns the number of rescored tasks.
+        """
+        user = db.session.get(User, user_id)
+        compiled_rules = self.priority_calculator.compile_user_rules(user)
+        now = self.priority_calculator.clock()
+
+        affected_clauses = []
+        for conditions in changed_rules_conditions:
+            compiled_conditions = self.priority_calculator.rule_compiler.compile_conditions(conditions)
+            if not compiled_conditions:
+                continue
+            static_conditions = [condition for condition in compiled_conditions if condition.field not in TIME_FIELDS]
+            affected_clauses.append(self.sql_score_builder.conditions_clause(static_conditions))
+        # The duration clauses are null for tasks without a duration, which are not affected.
+        affected = sa.func.coalesce(sa.or_(sa.false(), *affected_clauses), sa.false())
+
+        db.session.execute(
+            sa.update(Task)
+            .where(Task.user_id == user_id, Task.score_rules_version == rules_version - 1, sa.not_(affected))
+            .values(score_rules_version=rules_version)
+            .execution_options(synchronize_session=False)
+        )
+
+        return self._refresh(user, compiled_rules, affected, now)
+
+    def _refresh(self, user: User, compiled_rules: CompiledRuleSet, condition: sa.ColumnElement[bool],
+                 now: datetime) -> int:
+        """Stores the scores of the user's tasks matching the condition, committing in chunks ordered by id."""
+        query = (
+            sa.select(Task)
+            .where(Task.user_id == user.id, condition)
+            .options(so.joinedload(Task.category), so.joinedload(Task.tags))
+            .order_by(Task.id.asc())
+            .limit(REFRESH_CHUNK_SIZE)
+        )
+
+        refreshed = 0
+        last_task_id = None
+        while True:
+            chunk_query = query if last_task_id is None else query.where(Task.id > last_task_id)
+            chunk = db.session.scalars(chunk_query).unique().all()
+
+            self.store_many(chunk, user, compiled_rules, now)
+            refreshed += len(chunk)
+
+            if chunk:
+                last_task_id = chunk[-1].id
+            db.session.commit()
+
+            if len(chunk) < REFRESH_CHUNK_SIZE:
+                return refreshed
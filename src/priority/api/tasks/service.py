@@ -1,12 +1,25 @@
-from typing import List
+import heapq
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
 
-from flask import abort
+from flask import abort, current_app
 import sqlalchemy as sa
+import sqlalchemy.orm as so
+from sqlalchemy.dialects import postgresql
 
-from .schemas import TaskCreateInput, TaskUpdateInput, TasksFilterParams
+from .schemas import (
+    TaskCreateInput, TaskUpdateInput, TasksFilterParams, TasksBulkSelection, TasksBulkChanges
+)
 from src.priority.extensions import db
-from src.priority.core import PriorityCalculator
-from .models import Task, Category, Tag
+from src.priority.core import PriorityCalculator, CompiledRuleSet, SqlScoreBuilder, ScoringContext
+from src.priority.api.users.models import User
+from .models import Task, Category, Tag, task_tags
+from .pagination import SortKey, decode_cursor, task_sort_key
+from .read_model import TaskRecord, task_records_query, to_task_record
+from .scores import TaskScoreService
+SCORING_CHUNK_SIZE = 5000
+EXPORT_CHUNK_SIZE = 1000
+
 
 class TaskService:
     """
@@ -16,30 +29,200 @@ class TaskService:
     The methods return tasks with a calculated priority score.
     """
 
-    def __init__(self, priority_calculator: PriorityCalculator):
+    def __init__(self, priority_calculator: PriorityCalculator, sql_score_builder: Optional[SqlScoreBuilder] = None,
+                 score_service: Optional[TaskScoreService] = None):
         self.priority_calculator = priority_calculator
+        self.sql_score_builder = sql_score_builder or SqlScoreBuilder()
+        self.score_service = score_service or TaskScoreService(priority_calculator, self.sql_score_builder)
+
+    def get_filtered(self, user_id: int, filters: TasksFilterParams) -> List[TaskRecord]:
+        """
+        Gets a page of user tasks with their priority scores.
+        Pages are selected with keyset pagination on the (order_by value, id) pair after the filters cursor.
+        Tasks are selected as read only TaskRecords, one row per task with its category and aggregated tags,
+        which are much cheaper than ORM objects for listings.
+        The user's rules are compiled once, so the number of queries does not depend on the number of tasks.
+        With the 'sql' scoring backend the scores are computed, filtered and ordered in the db.
+        With the 'materialized' backend the stale stored scores are refreshed first,
+        and the tasks are filtered and ordered by the stored scores.
+        All the scores of the page are computed at the same instant, captured once.
+        """
+        user = db.session.get(User, user_id)
+        if user is None:
+            return []
+        compiled_rules = self.priority_calculator.compile_user_rules(user)
+        context = self.priority_calculator.scoring_context()
 
-    def get_filtered(self, user_id: int, filters: TasksFilterParams) -> List[Task]:
-        """Gets all user tasks with their priority scores."""
-        query = sa.select(Task).where(Task.user_id == user_id)
+        query = task_records_query().where(Task.user_id == user_id)
 
         if filters.completed is not None:
             query = query.where(Task.completed == filters.completed)
 
-        if filters.order_by == 'deadline':
-            query = query.order_by(Task.deadline.asc())
-        elif filters.order_by == 'created_at':
-            query = query.order_by(Task.created_at.desc())
+        after = decode_cursor(filters.cursor, filters.order_by) if filters.cursor else None
+
+        scoring_backend = current_app.config.get('PRIORITY_SCORING_BACKEND')
+        if scoring_backend == 'sql':
+            priority_score = self.sql_score_builder.build(compiled_rules, context.now)
+            return self._get_page_scored_in_db(query, priority_score, filters, after)
+
+        if scoring_backend == 'materialized':
+            self.score_service.refresh_stale(user, compiled_rules, context.now)
+            return self._get_page_scored_in_db(query, Task.priority_score, filters, after)
+
+        if filters.order_by == 'priority_score':
+            return self._get_page_ordered_by_score(query, compiled_rules, context, filters, after)
+
+        return self._get_page_ordered_by_column(query, compiled_rules, context, filters, after)
+
+    def export(self, user_id: int) -> Iterator[Task]:
+        """
+        Yields all user tasks with their priority scores, ordered by id.
+        Tasks are fetched with a server side cursor in chunks and removed from the session
+        once the next chunk is fetched, so the whole list is never held in memory.
+        All scores are computed at the same instant.
+        """
+        user = db.session.get(User, user_id)
+        if user is None:
+            return
+        compiled_rules = self.priority_calculator.compile_user_rules(user)
+        context = self.priority_calculator.scoring_context()
+
+        result = db.session.scalars(
+            sa.select(Task)
+            .where(Task.user_id == user_id)
+            .options(so.joinedload(Task.category), so.selectinload(Task.tags))
+            .order_by(Task.id.asc())
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        for chunk in result.partitions():
+            for task in chunk:
+                self._set_priority_score(task, self.priority_calculator.calculate_task_score(task, compiled_rules, context))
+                yield task
+
+            for task in chunk:
+                db.session.expunge(task)
 
-        tasks = db.session.scalars(query).all()
+    def _get_page_scored_in_db(self, query: sa.Select, priority_score: sa.ColumnElement[int],
+                               filters: TasksFilterParams, after: Optional[SortKey]) -> List[TaskRecord]:
+        """Adds the priority score expression to the tasks query to filter and order by it."""
+        priority_score = priority_score.label('page_priority_score')
+        query = query.add_columns(priority_score)
 
-        for task in tasks:
-            task.priority_score = self.priority_calculator.calculate_task_score(task)
+        if filters.min_priority_score is not None:
+            query = query.where(priority_score >= filters.min_priority_score)
 
         if filters.order_by == 'priority_score':
-            tasks = sorted(tasks, key=lambda task: task.priority_score, reverse=True)
+            if after is not None:
+                score, task_id = after
+                query = query.where(sa.or_(
+                    priority_score < score,
+                    sa.and_(priority_score == score, Task.id > task_id),
+                ))
+            query = query.order_by(priority_score.desc(), Task.id.asc())
+        else:
+            query = self._order_by_column(query, filters.order_by, after)
+
+        return [to_task_record(row, row.page_priority_score) for row in db.session.execute(query.limit(filters.limit))]
+
+    def _get_page_ordered_by_score(self, query: sa.Select, compiled_rules: CompiledRuleSet, context: ScoringContext,
+                                   filters: TasksFilterParams, after: Optional[SortKey]) -> List[TaskRecord]:
+        """
+        Selects the page of highest scoring tasks with a heap bounded to the page size,
+        loading and scoring tasks in chunks ordered by id.
+        Loading stops early once the page is full of tasks with the highest possible score,
+        and tasks that can't reach the minimal priority score are filtered out in the db.
+        """
+        if filters.min_priority_score is not None:
+            if filters.min_priority_score > compiled_rules.max_score_without_name_match():
+                query = query.where(self._matches_any_condition_name(compiled_rules))
+
+        max_score = compiled_rules.max_score()
+        if after is not None:
+            max_score = min(max_score, after[0])
+
+        heap = []
+        last_task_id = None
+        while True:
+            chunk_query = query.order_by(Task.id.asc()).limit(SCORING_CHUNK_SIZE)
+            if last_task_id is not None:
+                chunk_query = chunk_query.where(Task.id > last_task_id)
+            chunk = [to_task_record(row) for row in db.session.execute(chunk_query)]
+
+            for task in chunk:
+                task.priority_score = self.priority_calculator.calculate_task_score(task, compiled_rules, context)
+                if filters.min_priority_score is not None and task.priority_score < filters.min_priority_score:
+                    continue
+                if after is not None and (-task.priority_score, task.id) <= (-after[0], after[1]):
+                    continue
+
+                entry = (task.priority_score, -task.id, task)
+                if len(heap) < filters.limit:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+
+            page_is_final = len(heap) == filters.limit and heap[0][0] >= max_score
+            if len(chunk) < SCORING_CHUNK_SIZE or page_is_final:
+                break
+            last_task_id = chunk[-1].id
+
+        return [task for _, _, task in sorted(heap, reverse=True)]
+
+    def _matches_any_condition_name(self, compiled_rules: CompiledRuleSet) -> sa.ColumnElement[bool]:
+        """Tasks with a category or a tag that some rule condition is comparing with."""
+        return sa.or_(
+            Task.category.has(Category.name.in_(compiled_rules.condition_values('category'))),
+            Task.tags.any(sa.func.lower(Tag.name).in_(compiled_rules.condition_values('tag'))),
+        )
 
-        return tasks
+    def _get_page_ordered_by_column(self, query: sa.Select, compiled_rules: CompiledRuleSet, context: ScoringContext,
+                                    filters: TasksFilterParams, after: Optional[SortKey]) -> List[TaskRecord]:
+        """
+        Loads and scores tasks page by page from the db, which uses the column index for ordering.
+        More pages are only loaded when the priority score filter skipped some tasks.
+        """
+        tasks = []
+        while True:
+            page_query = self._order_by_column(query, filters.order_by, after).limit(filters.limit)
+            page = [to_task_record(row) for row in db.session.execute(page_query)]
+
+            for task in page:
+                task.priority_score = self.priority_calculator.calculate_task_score(task, compiled_rules, context)
+                if filters.min_priority_score is None or task.priority_score >= filters.min_priority_score:
+                    tasks.append(task)
+                    if len(tasks) == filters.limit:
+                        return tasks
+
+            if len(page) < filters.limit:
+                return tasks
+
+            after = task_sort_key(page[-1], filters.order_by)
+
+    def _set_priority_score(self, task: Task, score: int):
+        """Sets the score computed for a response without marking the task as modified."""
+        so.attributes.set_committed_value(task, 'priority_score', score)
+
+    def _order_by_column(self, query: sa.Select, order_by: str, after: Optional[SortKey]) -> sa.Select:
+        """Orders the tasks query by deadline or created_at and starts it after the sort key."""
+        if order_by == 'deadline':
+            if after is not None:
+                query = query.where(self._after_deadline(*after))
+            return query.order_by(Task.deadline.asc().nulls_last(), Task.id.asc())
+
+        if after is not None:
+            query = query.where(sa.tuple_(Task.created_at, Task.id) < after)
+        return query.order_by(Task.created_at.desc(), Task.id.desc())
+
+    def _after_deadline(self, deadline: Optional[datetime], task_id: int) -> sa.ColumnElement[bool]:
+        """Tasks after the sort key in deadline order, where tasks without a deadline are last."""
+        if deadline is None:
+            return sa.and_(Task.deadline.is_(None), Task.id > task_id)
+
+        return sa.or_(
+            Task.deadline > deadline,
+            sa.and_(Task.deadline == deadline, Task.id > task_id),
+            Task.deadline.is_(None),
+        )
 
     def create(self, user_id: int, task_data: TaskCreateInput) -> Task:
         """Creates a new task for the user."""
@@ -57,12 +240,74 @@ class TaskService:
         task.tags = self._get_or_create_user_tags(user_id, task_data.tags)
 
         db.session.add(task)
+        self._store_score(task)
+        self._bump_tasks_version(user_id)
         db.session.commit()
 
-        task.priority_score = self.priority_calculator.calculate_task_score(task)
-
         return task
 
+    def create_many(self, user_id: int, tasks_data: List[TaskCreateInput]) -> List[Task]:
+        """
+        Creates many tasks for the user in a single transaction.
+        Category and tag names of all tasks are found or created with one upsert each.
+        The tasks are scored in one batch before they are inserted.
+        """
+        task_ids = self.insert_many(user_id, tasks_data)
+        db.session.commit()
+
+        return self._load_tasks(task_ids)
+
+    def insert_many(self, user_id: int, tasks_data: List[TaskCreateInput]) -> List[int]:
+        """Inserts and scores many tasks for the user without committing. Returns their ids in order."""
+        user = db.session.get(User, user_id)
+        if user is None:
+            abort(404, description="User not found")
+        now = self.priority_calculator.clock()
+
+        categories = self._get_or_create_user_categories(
+            user_id, [task_data.category for task_data in tasks_data if task_data.category]
+        )
+        tags = self._get_or_create_user_tags_by_name(
+            user_id, [tag_name for task_data in tasks_data for tag_name in task_data.tags or []]
+        )
+
+        tasks = []
+        for task_data in tasks_data:
+            tasks.append(Task(
+                title=task_data.title,
+                completed=task_data.completed,
+                duration=task_data.duration,
+                deadline=task_data.deadline,
+                created_at=now,
+                user_id=user_id,
+                category=categories[task_data.category.lower()] if task_data.category else None,
+                tags=list({tag_name: tags[tag_name] for tag_name in task_data.tags or []}.values()),
+            ))
+
+        compiled_rules = self.priority_calculator.compile_user_rules(user)
+        self.score_service.store_many(tasks, user, compiled_rules, now)
+
+        db.session.add_all(tasks)
+        db.session.flush()
+        self._bump_tasks_version(user_id)
+
+        return [task.id for task in tasks]
+
+    def _load_tasks(self, task_ids: List[int], populate_existing: bool = False) -> List[Task]:
+        """
+        Loads tasks with their categories and tags in one query, in the order of the ids.
+        Tasks already in the session are refreshed with populate_existing, after set based updates.
+        """
+        loaded_tasks = db.session.scalars(
+            sa.select(Task)
+            .where(Task.id.in_(task_ids))
+            .options(so.joinedload(Task.category), so.joinedload(Task.tags))
+            .execution_options(populate_existing=populate_existing)
+        ).unique().all()
+
+        tasks_by_id = {task.id: task for task in loaded_tasks}
+        return [tasks_by_id[task_id] for task_id in task_ids if task_id in tasks_by_id]
+
     def get(self, user_id: int, task_id: int) -> Task:
         """
         Gets a task by id for the user
@@ -84,7 +329,7 @@ class TaskService:
         """Get a task for a user and include the calculated priority score."""
         task = self.get(user_id, task_id)
 
-        task.priority_score = self.priority_calculator.calculate_task_score(task)
+        self._set_priority_score(task, self.priority_calculator.calculate_task_score(task))
 
         return task
 
@@ -110,10 +355,10 @@ class TaskService:
                 setattr(task, key, value)
 
         db.session.add(task)
+        self._store_score(task)
+        self._bump_tasks_version(user_id)
         db.session.commit()
 
-        task.priority_score = self.priority_calculator.calculate_task_score(task)
-
         return task
 
     def complete(self, user_id:int, task_id: int):
@@ -122,10 +367,10 @@ class TaskService:
         task.completed = True
 
         db.session.add(task)
+        self._store_score(task)
+        self._bump_tasks_version(user_id)
         db.session.commit()
 
-        task.priority_score = self.priority_calculator.calculate_task_score(task)
-
         return task
 
     def delete(self, user_id: int, task_id: int):
@@ -133,40 +378,135 @@ class TaskService:
         task = self.get(user_id, task_id)
 
         db.session.delete(task)
+        self._bump_tasks_version(user_id)
         db.session.commit()
 
-    def _get_or_create_user_category(self, user_id, category_name):
-        """Finds a category by name for a user, or creates it if it doesn't exist."""
-        category = db.session.scalar(
-            sa.Select(Category).where(
-                Category.user_id == user_id, Category.name == category_name
+    def complete_many(self, user_id: int, selection: TasksBulkSelection) -> List[Task]:
+        """Marks the selected tasks of the user as completed."""
+        return self.update_many(user_id, selection, TasksBulkChanges(completed=True))
+
+    def update_many(self, user_id: int, selection: TasksBulkSelection, changes: TasksBulkChanges) -> List[Task]:
+        """
+        Updates the selected tasks of the user with one UPDATE statement.
+        A new category will be created in db if it doesn't exist and some tasks are selected.
+        The updated tasks are loaded and rescored together, in a single transaction.
+        """
+        task_ids = sorted(db.session.scalars(sa.select(Task.id).where(self._selection_clause(user_id, selection))))
+        if not task_ids:
+            return []
+
+        values = changes.model_dump(exclude_unset=True)
+        if 'category' in values:
+            category_name = values.pop('category')
+            values['category_id'] = None
+            if category_name:
+                values['category_id'] = self._get_or_create_user_category(user_id, category_name).id
+
+        if values:
+            db.session.execute(
+                sa.update(Task)
+                .where(Task.id.in_(task_ids))
+                .values(**values)
+                .execution_options(synchronize_session=False)
             )
+
+        tasks = self._load_tasks(task_ids, populate_existing=True)
+        user = db.session.get(User, user_id)
+        compiled_rules = self.priority_calculator.compile_user_rules(user)
+        self.score_service.store_many(tasks, user, compiled_rules, self.priority_calculator.clock())
+        self._bump_tasks_version(user_id)
+        db.session.commit()
+
+        return self._load_tasks(task_ids)
+
+    def delete_many(self, user_id: int, selection: TasksBulkSelection) -> int:
+        """Deletes the selected tasks of the user with set based statements. Returns their count."""
+        # The ids are selected once, deleting the tag links first would unselect tasks selected by tag.
+        task_ids = db.session.scalars(sa.select(Task.id).where(self._selection_clause(user_id, selection))).all()
+        if not task_ids:
+            return 0
+
+        db.session.execute(sa.delete(task_tags).where(task_tags.c.task_id.in_(task_ids)))
+        deleted_task_ids = db.session.scalars(
+            sa.delete(Task)
+            .where(Task.id.in_(task_ids))
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if deleted_task_ids:
+            self._bump_tasks_version(user_id)
+        db.session.commit()
+
+        return len(deleted_task_ids)
+
+    def _selection_clause(self, user_id: int, selection: TasksBulkSelection) -> sa.ColumnElement[bool]:
+        """Tasks of the user matching all the criteria of the selection."""
+        clauses = [Task.user_id == user_id]
+        if selection.ids is not None:
+            clauses.append(Task.id.in_(selection.ids))
+        if selection.completed is not None:
+            clauses.append(Task.completed == selection.completed)
+        if selection.category is not None:
+            clauses.append(Task.category.has(Category.name == selection.category.lower()))
+        if selection.tag is not None:
+            clauses.append(Task.tags.any(sa.func.lower(Tag.name) == selection.tag.lower()))
+
+        return sa.and_(*clauses)
+
+    def _bump_tasks_version(self, user_id: int):
+        """Marks the user's task responses cached by clients as stale, see the etags module."""
+        db.session.execute(
+            sa.update(User)
+            .where(User.id == user_id)
+            .values(tasks_version=User.tasks_version + 1)
+            .execution_options(synchronize_session=False)
         )
 
-        if not category:
-            category = Category(
-                name=category_name.lower(),
-                user_id=user_id,
-            )
+    def _store_score(self, task: Task):
+        """Flushes the task so all of its fields are set, and stores its priority score."""
+        db.session.flush()
+        self.score_service.store(task, task.user)
 
-        return category
+    def _get_or_create_user_category(self, user_id, category_name):
+        """Finds a category by name for a user, or creates it if it doesn't exist."""
+        return self._get_or_create_user_categories(user_id, [category_name])[category_name.lower()]
 
     def _get_or_create_user_tags(self, user_id, tag_names):
         """Finds tags by name for a user, or creates them if they don't exist."""
-        tags = []
-        for tag_name in tag_names:
-            tag = db.session.scalar(
-                sa.Select(Tag).where(
-                    Tag.user_id == user_id, Tag.name == tag_name
-                )
-            )
+        tags = self._get_or_create_user_tags_by_name(user_id, tag_names)
+        return list({tag_name: tags[tag_name] for tag_name in tag_names}.values())
 
-            if not tag:
-                tag = Tag(
-                    name=tag_name,
-                    user_id=user_id,
-                )
+    def _get_or_create_user_categories(self, user_id: int, category_names: List[str]) -> Dict[str, Category]:
+        """Finds or creates the user's categories by name. Names are stored in lowercase."""
+        return self._get_or_create_user_names(Category, user_id, {name.lower() for name in category_names})
 
-            tags.append(tag)
+    def _get_or_create_user_tags_by_name(self, user_id: int, tag_names: List[str]) -> Dict[str, Tag]:
+        """Finds or creates the user's tags by name."""
+        return self._get_or_create_user_names(Tag, user_id, set(tag_names))
+
+    def _get_or_create_user_names(self, model, user_id: int, names: Set[str]) -> Dict[str, Any]:
+        """
+        Inserts all the missing categories or tags of the user with one INSERT ... ON CONFLICT DO NOTHING,
+        which is safe against concurrent inserts thanks to the unique (user_id, name) constraint.
+        The rows that already existed are not returned by the insert, so they are selected after it.
+        """
+        if not names:
+            return {}
+
+        inserted = db.session.scalars(
+            postgresql.insert(model)
+            .values([{'user_id': user_id, 'name': name} for name in sorted(names)])
+            .on_conflict_do_nothing(index_elements=['user_id', 'name'])
+            .returning(model)
+        ).all()
+        rows = {row.name: row for row in inserted}
+
+        existing_names = names - rows.keys()
+        if existing_names:
+            rows.update(
+                (row.name, row) for row in db.session.scalars(
+                    sa.select(model).where(model.user_id == user_id, model.name.in_(existing_names))
+                )
+            )
 
-        return tags
+        return rows
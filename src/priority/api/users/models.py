@@ -10,6 +10,8 @@ class User(db.Model):
     username: so.Mapped[str] = so.mapped_column(sa.String(64), index=True, unique=True)
     email: so.Mapped[str] = so.mapped_column(sa.String(120), index=True, unique=True)
     password_hash: so.Mapped[Optional[str]] = so.mapped_column(sa.String(256))
+    rules_version: so.Mapped[int] = so.mapped_column(default=0, server_default='0')
+    tasks_version: so.Mapped[int] = so.mapped_column(default=0, server_default='0')
 
     tasks: so.Mapped[List['Task']] = so.relationship(back_populates='user', cascade='all, delete-orphan')
     categories: so.Mapped[List['Category']] = so.relationship(back_populates='user', cascade='all, delete-orphan')
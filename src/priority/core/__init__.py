@@ -1 +1,13 @@
 from .priority_service import ConditionEvaluator, PriorityCalculator
+from .rule_compiler import (
+    RuleCompiler, CompiledRuleSet, CompiledRule, CompiledCondition, BoundRuleSet, RuleIndex, TaskFeatures,
+    NAME_FIELDS, TIME_FIELDS
+)
+from .scoring_context import ScoringContext, Clock, utc_now
+from .symbols import SymbolTable, normalize_name, NO_CATEGORY
+from .condition_stats import ConditionStatistics
+from .decision_diagram import DecisionDiagram, DecisionDiagramTooLarge
+from .ruleset_cache import CompiledRuleSetCache
+from .sql_score import SqlScoreBuilder
+from .score_scheduler import ScoreRefreshScheduler
+from .batch_scorer import BatchScorer, TaskColumns
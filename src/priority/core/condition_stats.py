@@ -0,0 +1,46 @@
+from typing import List, Optional, Sequence
+
+SAMPLE_EVERY = 16
+MAX_EVALUATIONS = 4096
+
+
+class ConditionStatistics:
+    """
+    Pass rates of a compiled rule set's shared conditions, by slot, collected from scoring passes.
+    Only one in sample_every scored tasks is recorded, so collecting costs little,
+    and the counts of a condition are halved when it reaches max_evaluations,
+    so older passes weigh less and the rates follow changes in the user's tasks.
+    Updates from concurrent passes can be lost, which only makes the rates approximate.
+    """
+
+    def __init__(self, size: int, sample_every: int = SAMPLE_EVERY, max_evaluations: int = MAX_EVALUATIONS):
+        self.sample_every = sample_every
+        self.max_evaluations = max_evaluations
+        self.evaluated: List[int] = [0] * size
+        self.passed: List[int] = [0] * size
+        self._scored = 0
+
+    def sample(self) -> bool:
+        """Counts a scored task, and checks if its outcomes should be recorded."""
+        self._scored += 1
+        return self._scored % self.sample_every == 0
+
+    def record(self, outcomes: Sequence[Optional[bool]]):
+        """Records the outcomes of the conditions evaluated for a task, None for the ones that were not."""
+        for slot, outcome in enumerate(outcomes):
+            if outcome is None:
+                continue
+
+            self.evaluated[slot] += 1
+            if outcome:
+                self.passed[slot] += 1
+            if self.evaluated[slot] >= self.max_evaluations:
+                self.evaluated[slot] //= 2
+                self.passed[slot] //= 2
+
+    def pass_rates(self) -> List[float]:
+        """
+        Estimated probability that each condition applies, with add-one smoothing,
+        so conditions without recorded outcomes are estimated at one half.
+        """
+        return [(passed + 1) / (evaluated + 2) for passed, evaluated in zip(self.passed, self.evaluated)]
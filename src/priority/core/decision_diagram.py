@@ -0,0 +1,164 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+MAX_DIAGRAM_NODES = 20000
+
+# A rule reduced to its boost, its required category code (None for any category), its required tag bits
+# and the slots of its shared duration and time conditions.
+EncodedRule = Tuple[int, Optional[int], int, Tuple[int, ...]]
+
+# A node tests one variable: (is_tag, key, high_boost, high, low), where key is the tag bit or the condition slot,
+# and high_boost is added when the variable is true. None is the leaf.
+Node = Optional[Tuple[bool, int, int, Any, Any]]
+
+# Rules still waiting for some of their variables, as (remaining variables, total boost) pairs.
+Pending = Tuple[Tuple[Tuple[int, ...], int], ...]
+
+
+class DecisionDiagramTooLarge(Exception):
+    """Raised when a rule set would compile into more than the maximum number of nodes."""
+
+
+@dataclass(frozen=True)
+class DecisionDiagram:
+    """
+    A user's rules compiled into a shared decision diagram over condition outcomes,
+    so a task is scored by walking one path and summing the boosts on its edges instead of testing every rule.
+    The root switches on the task's category code, the next levels test the shared duration and time conditions
+    by slot, and the last levels test tag bits. Tags come last so the rules pending after each tag test
+    only wait for other tags, which keeps the diagram from growing with the number of tag combinations.
+    Equal sub-diagrams are shared, and levels no pending rule refers to are skipped.
+    """
+    by_category: Dict[int, Tuple[int, Node]]
+    default: Tuple[int, Node]
+    size: int
+
+    @classmethod
+    def build(cls, rules: Iterable[EncodedRule], slot_count: int,
+              max_nodes: Optional[int] = None) -> 'DecisionDiagram':
+        """
+        Builds the diagram of encoded rules, where the slots are below slot_count.
+        Raises DecisionDiagramTooLarge if it would have more than max_nodes nodes, MAX_DIAGRAM_NODES by default.
+        """
+        if max_nodes is None:
+            max_nodes = MAX_DIAGRAM_NODES
+
+        any_category: Dict[Tuple[int, ...], int] = defaultdict(int)
+        by_category: Dict[int, Dict[Tuple[int, ...], int]] = defaultdict(lambda: defaultdict(int))
+        for boost, category, tags, slots in rules:
+            variables = tuple(sorted(set(slots))) + _tag_variables(tags, slot_count)
+            pending = any_category if category is None else by_category[category]
+            pending[variables] += boost
+
+        builder = _DiagramBuilder(slot_count, max_nodes)
+        default = builder.edge(any_category)
+        by_category_edges = {}
+        for category, pending in by_category.items():
+            for variables, boost in any_category.items():
+                pending[variables] += boost
+            by_category_edges[category] = builder.edge(pending)
+
+        return cls(by_category=by_category_edges, default=default, size=builder.size)
+
+    def score(self, category: int, tags: int, features: Any, conditions: Sequence[Any]) -> int:
+        """
+        Sums the boosts along the path of a task with the category code and tag bits.
+        The conditions are the bound shared conditions by slot, evaluated against the features on the way.
+        """
+        total_score, node = self.by_category.get(category, self.default)
+        while node is not None:
+            is_tag, key, high_boost, high, low = node
+            if tags & key if is_tag else conditions[key].applies(features):
+                total_score += high_boost
+                node = high
+            else:
+                node = low
+        return total_score
+
+
+def _tag_variables(tags: int, slot_count: int) -> Tuple[int, ...]:
+    """Numbers the tag bits after the slots, in increasing order."""
+    variables = []
+    code = 0
+    while tags:
+        if tags & 1:
+            variables.append(slot_count + code)
+        tags >>= 1
+        code += 1
+    return tuple(variables)
+
+
+class _DiagramBuilder:
+    """Builds the nodes below the category switch, sharing the nodes of equal pending rules."""
+
+    def __init__(self, slot_count: int, max_nodes: int):
+        self.slot_count = slot_count
+        self.max_nodes = max_nodes
+        self._nodes: Dict[Pending, Node] = {(): None}
+
+    @property
+    def size(self) -> int:
+        return len(self._nodes) - 1
+
+    def edge(self, pending: Dict[Tuple[int, ...], int]) -> Tuple[int, Node]:
+        """Returns the boost of the rules already satisfied and the node of the pending ones."""
+        boost = pending.get((), 0)
+        return boost, self._node(_freeze({variables: total for variables, total in pending.items() if variables}))
+
+    def _node(self, root: Pending) -> Node:
+        """Builds the node of the pending rules and its descendants, iteratively since paths can be long."""
+        splits: Dict[Pending, Tuple[int, int, Pending, Pending]] = {}
+        stack = [root]
+        while stack:
+            pending = stack[-1]
+            if pending in self._nodes:
+                stack.pop()
+                continue
+
+            split = splits.get(pending)
+            if split is None:
+                split = splits[pending] = self._split(pending)
+            variable, high_boost, high, low = split
+
+            missing = [child for child in (high, low) if child not in self._nodes]
+            if missing:
+                stack.extend(missing)
+                continue
+
+            stack.pop()
+            is_tag = variable >= self.slot_count
+            key = 1 << (variable - self.slot_count) if is_tag else variable
+            self._nodes[pending] = (is_tag, key, high_boost, self._nodes[high], self._nodes[low])
+            if self.size > self.max_nodes:
+                raise DecisionDiagramTooLarge(f"More than {self.max_nodes} decision diagram nodes")
+
+        return self._nodes[root]
+
+    @staticmethod
+    def _split(pending: Pending) -> Tuple[int, int, Pending, Pending]:
+        """
+        Splits the pending rules on the lowest variable they wait for.
+        When it is true the rules waiting for it move on to their next variable, or add their boost
+        if it was their last one. When it is false they can no longer apply.
+        """
+        variable = min(variables[0] for variables, _ in pending)
+
+        high_boost = 0
+        high: Dict[Tuple[int, ...], int] = defaultdict(int)
+        low: Dict[Tuple[int, ...], int] = defaultdict(int)
+        for variables, boost in pending:
+            if variables[0] != variable:
+                high[variables] += boost
+                low[variables] += boost
+            elif len(variables) > 1:
+                high[variables[1:]] += boost
+            else:
+                high_boost += boost
+
+        return variable, high_boost, _freeze(high), _freeze(low)
+
+
+def _freeze(pending: Dict[Tuple[int, ...], int]) -> Pending:
+    """The hashable form of pending rules, without the ones whose boosts cancel out."""
+    return tuple(sorted((variables, boost) for variables, boost in pending.items() if boost != 0))
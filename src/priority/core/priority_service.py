@@ -1,9 +1,14 @@
-from datetime import datetime, timezone, timedelta
-from typing import Dict, Tuple, Callable, Any, List
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Dict, Tuple, Callable, Any, Collection, Optional
 
 from src.priority.api.tasks.models import Task
-from src.priority.api.rules.models import Rule, Condition
-from src.priority.utils import parse_timedelta
+from src.priority.api.users.models import User
+from src.priority.durations import parse_duration
+from .rule_compiler import RuleCompiler, CompiledRuleSet
+from .ruleset_cache import CompiledRuleSetCache
+from .scoring_context import Clock, ScoringContext, utc_now
+from .symbols import normalize_name
 
 
 class ConditionEvaluator:
@@ -11,10 +16,13 @@ class ConditionEvaluator:
     Evaluates field values against conditions.
     The class calls specific evaluation functions based on the field name and operator.
     It contains the implementation for all supported comparisons.
+    Deadline and created_at conditions are relative to now, so their values are converted
+    to absolute thresholds once, when the condition is bound to a scoring pass's now.
     """
 
-    def __init__(self):
-        self._evaluators_map: Dict[Tuple[str, str], Callable[[Any, str], bool]] = {
+    def __init__(self, clock: Clock = utc_now):
+        self.clock = clock
+        self._evaluators_map: Dict[Tuple[str, str], Callable[[Any, Any], bool]] = {
             ('category', 'equals'): self._category_equals,
             ('tag', 'equals'): self._tag_equals,
             ('duration', 'less_than'): self._duration_less_than,
@@ -24,105 +32,148 @@ class ConditionEvaluator:
             ('created_at', 'less_than'): self._created_at_less_than,
             ('created_at', 'greater_than'): self._created_at_greater_than,
         }
+        self._value_parsers_map: Dict[str, Callable[[str], Any]] = {
+            'category': normalize_name,
+            'tag': normalize_name,
+            'duration': parse_duration,
+            'deadline': parse_duration,
+            'created_at': parse_duration,
+        }
+        self._thresholds_map: Dict[str, Callable[[timedelta, datetime], datetime]] = {
+            'deadline': lambda value, now: now + value,
+            'created_at': lambda value, now: now - value,
+        }
 
-    def evaluate(self, field_name: str, field_value: Any, operator: str, condition_value: str) -> bool:
+    def evaluate(self, field_name: str, field_value: Any, operator: str, condition_value: str,
+                 context: Optional[ScoringContext] = None) -> bool:
         """
         Calls the specific evaluation function based on the field name and operator
-        which will compare the field and condition values
+        which will compare the field and condition values at the context's now
         """
-        evaluator_function = self._evaluators_map.get((field_name, operator))
+        now = context.now if context is not None else self.clock()
+        predicate = self.compile(field_name, operator, condition_value, now)
 
-        if evaluator_function is None:
+        if predicate is None:
             return False
 
-        return evaluator_function(field_value, condition_value)
+        return predicate(field_value)
+
+    def compile(self, field_name: str, operator: str, condition_value: str,
+                now: datetime) -> Optional[Callable[[Any], bool]]:
+        """
+        Parses the condition value once and binds it to the evaluation function
+        for the field name and operator. Returns None for unsupported conditions.
+        """
+        if not self.supports(field_name, operator):
+            return None
+
+        return self.bind(field_name, operator, self.parse_value(field_name, condition_value), now)
+
+    def supports(self, field_name: str, operator: str) -> bool:
+        """Checks if there is an evaluation function for the field name and operator"""
+        return (field_name, operator) in self._evaluators_map
+
+    def parse_value(self, field_name: str, condition_value: str) -> Any:
+        """Converts the stored condition value to the type compared with the field value"""
+        return self._value_parsers_map[field_name](condition_value)
+
+    def bind(self, field_name: str, operator: str, parsed_value: Any, now: datetime) -> Callable[[Any], bool]:
+        """
+        Binds an already parsed condition value to the evaluation function.
+        Time conditions are bound to their absolute threshold at now.
+        """
+        threshold = self._thresholds_map.get(field_name)
+        value = threshold(parsed_value, now) if threshold is not None else parsed_value
+        return partial(self._evaluators_map[(field_name, operator)], value=value)
 
     def _category_equals(self, category_name: str, value: str) -> bool:
         """Checks if the category matches"""
-        return category_name == value.lower()
+        return category_name == value
 
-    def _tag_equals(self, tag_names: List[str], value: str) -> bool:
-        """Checks if a tag exists in a list of tag names"""
-        return value.lower() in tag_names
+    def _tag_equals(self, tag_names: Collection[str], value: str) -> bool:
+        """Checks if a tag exists in the tag names, a set when evaluated with task features"""
+        return value in tag_names
 
-    def _duration_less_than(self, duration: timedelta, value: str) -> bool:
+    def _duration_less_than(self, duration: timedelta, value: timedelta) -> bool:
         """Checks if the duration in minutes is less than  or equals to the given timedelta"""
-        value_timedelta = parse_timedelta(value)
-        return duration <= value_timedelta
+        return duration <= value
 
-    def _duration_greater_than(self, duration: timedelta, value: str) -> bool:
+    def _duration_greater_than(self, duration: timedelta, value: timedelta) -> bool:
         """Checks if the duration in minutes is greater than the given timedelta"""
-        value_timedelta = parse_timedelta(value)
-        return duration > value_timedelta
+        return duration > value
 
-    def _deadline_less_than(self, deadline: datetime, value: str) -> bool:
-        """Checks if the deadline is within the timedelta from now."""
-        value_timedelta = parse_timedelta(value)
-        return deadline <= (datetime.now(timezone.utc) + value_timedelta)
+    def _deadline_less_than(self, deadline: datetime, value: datetime) -> bool:
+        """Checks if the deadline is within the timedelta from now, given as the threshold now + timedelta."""
+        return deadline <= value
 
-    def _deadline_greater_than(self, deadline: datetime, value: str) -> bool:
-        """Checks if the deadline is later than the timedelta from now."""
-        value_timedelta = parse_timedelta(value)
-        return deadline > (datetime.now(timezone.utc) + value_timedelta)
+    def _deadline_greater_than(self, deadline: datetime, value: datetime) -> bool:
+        """Checks if the deadline is later than the timedelta from now, given as the threshold now + timedelta."""
+        return deadline > value
 
-    def _created_at_greater_than(self, created_at: datetime, value: str) -> bool:
-        """Checks if created_at is more timedelta from now in the past"""
-        value_timedelta = parse_timedelta(value)
-        return created_at <= (datetime.now(timezone.utc) - value_timedelta)
+    def _created_at_greater_than(self, created_at: datetime, value: datetime) -> bool:
+        """Checks if created_at is more timedelta from now in the past, given as the threshold now - timedelta."""
+        return created_at <= value
 
-    def _created_at_less_than(self, created_at: datetime, value: str) -> bool:
-        """Checks if created_at is within timedelta from now in the past"""
-        value_timedelta = parse_timedelta(value)
-        return created_at > (datetime.now(timezone.utc) - value_timedelta)
+    def _created_at_less_than(self, created_at: datetime, value: datetime) -> bool:
+        """Checks if created_at is within timedelta from now in the past, given as the threshold now - timedelta."""
+        return created_at > value
 
 
 class PriorityCalculator:
-    """Calculates the task's priority score based on user's rules."""
+    """
+    Calculates the task's priority score based on user's rules.
+    The rules are compiled once into a CompiledRuleSet which is then used for scoring.
+    If a cache is given, compiled rule sets are reused until the user's rules version changes.
+    Scores are computed at the now of a ScoringContext, captured once from the clock for a whole pass.
+    With decision_diagram, the rules are compiled into a decision diagram which tasks are scored by walking.
+    """
 
-    def __init__(self, condition_evaluator: ConditionEvaluator):
+    def __init__(self, condition_evaluator: ConditionEvaluator, ruleset_cache: Optional[CompiledRuleSetCache] = None,
+                 clock: Optional[Clock] = None, decision_diagram: bool = False):
         self.condition_evaluator = condition_evaluator
+        self.rule_compiler = RuleCompiler(condition_evaluator, decision_diagram)
+        self.ruleset_cache = ruleset_cache
+        self.clock = clock or condition_evaluator.clock
 
-    def calculate_task_score(self, task: Task) -> int:
+    def scoring_context(self) -> ScoringContext:
+        """Captures the current instant of the clock for a scoring pass."""
+        return ScoringContext.capture(self.clock)
+
+    def compile_user_rules(self, user: User) -> CompiledRuleSet:
         """
-        Calculates the task priority score by iterating the user's rules
-        and adding the boost of the rules that apply
+        Compiles the user's rules into a scoring plan.
+        The rules are only loaded from the db when the plan is not cached.
         """
-        if not task.user:
-            return 0
-
-        total_score = 0
+        if self.ruleset_cache is None:
+            return self.rule_compiler.compile(user.rules)
 
-        for rule in task.user.rules:
-            if self._rule_applies(task, rule):
-                total_score += rule.boost
-        return total_score
+        compiled_rules = self.ruleset_cache.get(user.id, user.rules_version)
+        if compiled_rules is None:
+            compiled_rules = self.rule_compiler.compile(user.rules)
+            self.ruleset_cache.put(user.id, user.rules_version, compiled_rules)
 
-    def _rule_applies(self, task: Task, rule: Rule) -> bool:
-        """Checks if all the conditions for a given rule apply"""
-        if not rule.conditions:
-            return False
-        return all(self._condition_applies(task, condition) for condition in rule.conditions)
+        return compiled_rules
 
-    def _condition_applies(self, task: Task, condition: Condition) -> bool:
+    def calculate_task_score(self, task: Task, compiled_rules: Optional[CompiledRuleSet] = None,
+                             context: Optional[ScoringContext] = None) -> int:
         """
-        Checks if a specific condition applies to the given task.
-        Extracts the task field information and calls ConditionEvaluator.
+        Calculates the task priority score by adding the boost of the rules that apply.
+        Compiled rules and a scoring context can be passed when scoring many tasks of the same user,
+        otherwise the task user's rules are compiled and the current instant is used.
         """
-        field_value_map = {
-            'category': task.category.name if task.category else None,
-            'tag': [tag.name for tag in task.tags],
-            'duration': task.duration,
-            'deadline': task.deadline,
-            'created_at': task.created_at,
-        }
-
-        field_value = field_value_map.get(condition.field, None)
-        if field_value is None:
-            return False
-
-        return self.condition_evaluator.evaluate(
-            field_name=condition.field,
-            field_value=field_value,
-            operator=condition.operator,
-            condition_value=condition.value
-        )
+        if compiled_rules is None:
+            if not task.user:
+                return 0
+            compiled_rules = self.compile_user_rules(task.user)
+
+        return compiled_rules.score(task, context or self.scoring_context())
+
+    def next_score_change_at(self, task: Task, compiled_rules: Optional[CompiledRuleSet] = None,
+                             now: Optional[datetime] = None) -> Optional[datetime]:
+        """Returns the next instant at which the task's priority score can change, or None if it can't."""
+        if compiled_rules is None:
+            if not task.user:
+                return None
+            compiled_rules = self.compile_user_rules(task.user)
+
+        return compiled_rules.next_change_at(task, now or self.clock())
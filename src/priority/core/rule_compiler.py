@@ -0,0 +1,510 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import cached_property, partial
+from operator import attrgetter
+from typing import (
+    Any, Callable, Dict, FrozenSet, Generic, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar,
+    TYPE_CHECKING
+)
+
+from src.priority.api.rules.models import Rule, Condition
+from src.priority.api.tasks.models import Task
+from .scoring_context import ScoringContext
+from .symbols import SymbolTable, NO_CATEGORY
+from .condition_stats import ConditionStatistics
+from .decision_diagram import DecisionDiagram, DecisionDiagramTooLarge, EncodedRule
+
+NAME_FIELDS = ('category', 'tag')
+TIME_FIELDS = ('deadline', 'created_at')
+STATIC_FIELDS = ('category', 'tag', 'duration')
+
+if TYPE_CHECKING:
+    from .priority_service import ConditionEvaluator
+
+R = TypeVar('R')
+S = TypeVar('S')
+
+
+@dataclass(frozen=True, slots=True)
+class TaskFeatures:
+    """
+    The task values conditions compare with, extracted once per task and scoring pass
+    instead of reading the task's relationships for every condition.
+    The category and tags are encoded with the rule set's symbol table.
+    """
+    category: int
+    tags: int
+    duration: Optional[timedelta]
+    deadline: Optional[datetime]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def extract(cls, task: Task, symbols: SymbolTable) -> 'TaskFeatures':
+        """Extracts the features of a task, or of any object with the same attributes like a TaskRecord."""
+        return cls(
+            category=symbols.category_code(task.category.name if task.category else None),
+            tags=symbols.tags_mask(tag.name for tag in task.tags),
+            duration=task.duration,
+            deadline=task.deadline,
+            created_at=task.created_at,
+        )
+
+
+# The feature each duration and time condition compares with.
+FEATURE_GETTERS: Dict[str, Callable[[TaskFeatures], Any]] = {
+    'duration': attrgetter('duration'),
+    'deadline': attrgetter('deadline'),
+    'created_at': attrgetter('created_at'),
+}
+
+# Category requirement of a rule without category conditions, and of one with two different categories.
+ANY_CATEGORY = -2
+CONFLICTING_CATEGORIES = -3
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """A condition with its value parsed once, bound to the evaluation function for a scoring pass's now."""
+    field: str
+    operator: str
+    value: Any
+    bind: Callable[[datetime], Callable[[Any], bool]]
+
+    @property
+    def key(self) -> Tuple[str, str, Any]:
+        """Identifies the condition, rules with the same condition share its evaluation."""
+        return self.field, self.operator, self.value
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A rule that applies when all of its compiled conditions apply."""
+    rule_id: int
+    boost: int
+    conditions: Tuple[CompiledCondition, ...]
+
+
+@dataclass(frozen=True)
+class BoundCondition:
+    """
+    A condition predicate comparing the task feature of its field with absolute values.
+    The slot is the position of the condition's outcome among the distinct conditions of the rule set.
+    """
+    field: str
+    predicate: Callable[[Any], bool]
+    feature: Callable[[TaskFeatures], Any]
+    slot: int
+
+    @classmethod
+    def of(cls, condition: CompiledCondition, now: datetime, slot: int) -> 'BoundCondition':
+        """Binds a compiled duration or time condition to now."""
+        return cls(condition.field, condition.bind(now), FEATURE_GETTERS[condition.field], slot)
+
+    def applies(self, features: TaskFeatures) -> bool:
+        """Checks if the condition applies to the task features, it never applies to a missing value."""
+        field_value = self.feature(features)
+        return field_value is not None and self.predicate(field_value)
+
+
+BoundConditions = Dict[Tuple[str, str, Any], BoundCondition]
+
+
+@dataclass(frozen=True)
+class BoundRule:
+    """
+    A compiled rule ready to be evaluated against task features.
+    The category and tag conditions are encoded as the required category code and mask of tag bits,
+    the other conditions are the rule set's shared conditions bound to a scoring pass's now.
+    """
+    boost: int
+    category: int
+    tags: int
+    conditions: Tuple[BoundCondition, ...]
+
+    @classmethod
+    def of(cls, rule: CompiledRule, symbols: SymbolTable, bound_conditions: BoundConditions,
+           fields: Optional[Tuple[str, ...]] = None, pass_rates: Optional[Sequence[float]] = None) -> 'BoundRule':
+        """
+        Encodes the rule's name conditions and picks its bound conditions, or only the ones on the given fields.
+        With the pass rates of the slots, the bound conditions are ordered so the ones that fail most often
+        are evaluated first, and the evaluation stops earlier for rules that don't apply.
+        The name conditions are always checked first, since they are single integer operations.
+        """
+        category = ANY_CATEGORY
+        tags = 0
+        conditions = []
+        for condition in rule.conditions:
+            if fields is not None and condition.field not in fields:
+                continue
+
+            if condition.field == 'category':
+                code = symbols.category_code(condition.value)
+                category = code if category in (ANY_CATEGORY, code) else CONFLICTING_CATEGORIES
+            elif condition.field == 'tag':
+                tags |= symbols.tag_bit(condition.value)
+            else:
+                conditions.append(bound_conditions[condition.key])
+
+        if pass_rates is not None:
+            conditions.sort(key=lambda condition: pass_rates[condition.slot])
+
+        return cls(boost=rule.boost, category=category, tags=tags, conditions=tuple(conditions))
+
+    def applies(self, features: TaskFeatures, outcomes: List[Optional[bool]]) -> bool:
+        """
+        Checks if all the conditions of the rule apply to the task features.
+        The outcomes of the task's conditions, by slot, are evaluated once and reused by the other rules.
+        """
+        if self.category != ANY_CATEGORY and self.category != features.category:
+            return False
+        if features.tags & self.tags != self.tags:
+            return False
+
+        for condition in self.conditions:
+            outcome = outcomes[condition.slot]
+            if outcome is None:
+                outcome = outcomes[condition.slot] = condition.applies(features)
+            if not outcome:
+                return False
+        return True
+
+
+@dataclass(frozen=True)
+class RuleIndex(Generic[R]):
+    """
+    Inverted index of rules by the category or tag one of their equals conditions requires.
+    A rule can only apply to tasks with that category or tag, so the rules of others are skipped
+    without evaluating their conditions. Each rule is indexed once, by its category condition if it has one,
+    since a task has a single category, otherwise by its first tag condition.
+    Categories are indexed by their code and tags by their bit in the symbol table.
+    Rules without category or tag conditions are candidates for every task.
+    """
+    unindexed: Tuple[R, ...]
+    by_category: Dict[int, Tuple[R, ...]]
+    by_tag: Dict[int, Tuple[R, ...]]
+
+    @classmethod
+    def build(cls, rules: Iterable[CompiledRule], symbols: SymbolTable) -> 'RuleIndex[CompiledRule]':
+        """Indexes compiled rules by their category or tag condition values."""
+        unindexed = []
+        by_field: Dict[str, Dict[int, List[CompiledRule]]] = {'category': {}, 'tag': {}}
+        for rule in rules:
+            key = _index_key(rule)
+            if key is None:
+                unindexed.append(rule)
+                continue
+
+            field, value = key
+            code = symbols.category_code(value) if field == 'category' else symbols.tag_bit(value)
+            by_field[field].setdefault(code, []).append(rule)
+
+        return cls(
+            unindexed=tuple(unindexed),
+            by_category={code: tuple(rules) for code, rules in by_field['category'].items()},
+            by_tag={bit: tuple(rules) for bit, rules in by_field['tag'].items()},
+        )
+
+    def map(self, function: Callable[[R], S]) -> 'RuleIndex[S]':
+        """Returns the same index over the rules converted by the function, like their bound versions."""
+        return RuleIndex(
+            unindexed=tuple(map(function, self.unindexed)),
+            by_category={code: tuple(map(function, rules)) for code, rules in self.by_category.items()},
+            by_tag={bit: tuple(map(function, rules)) for bit, rules in self.by_tag.items()},
+        )
+
+    def candidates(self, features: TaskFeatures) -> Iterator[R]:
+        """Yields the rules that can apply to a task with the features, each once."""
+        yield from self.unindexed
+
+        if features.category != NO_CATEGORY:
+            yield from self.by_category.get(features.category, ())
+
+        if self.by_tag:
+            tags = features.tags
+            while tags:
+                bit = tags & -tags
+                yield from self.by_tag.get(bit, ())
+                tags ^= bit
+
+
+def _index_key(rule: CompiledRule) -> Optional[Tuple[str, str]]:
+    """The (field, value) pair a rule is indexed by, or None if it has no category or tag condition."""
+    tag_key = None
+    for condition in rule.conditions:
+        if condition.field == 'category':
+            return 'category', condition.value
+        if condition.field == 'tag' and tag_key is None:
+            tag_key = 'tag', condition.value
+    return tag_key
+
+
+@dataclass(frozen=True)
+class BoundRuleSet:
+    """
+    A compiled rule set bound to the now of a scoring pass, used to score its tasks.
+    The outcomes of a sample of the scored tasks are recorded in the statistics, if given.
+    With a decision diagram, tasks are scored by walking it with the bound conditions by slot instead.
+    """
+    now: datetime
+    symbols: SymbolTable
+    index: RuleIndex[BoundRule]
+    condition_count: int
+    statistics: Optional[ConditionStatistics] = None
+    diagram: Optional[DecisionDiagram] = None
+    conditions: Tuple[BoundCondition, ...] = ()
+
+    def score(self, task: Task) -> int:
+        """Sums the boosts of the rules whose conditions apply to the task."""
+        return self.score_features(TaskFeatures.extract(task, self.symbols))
+
+    def score_features(self, features: TaskFeatures) -> int:
+        """Sums the boosts of the rules whose conditions apply to the features, only evaluating candidate rules."""
+        if self.diagram is not None:
+            return self.diagram.score(features.category, features.tags, features, self.conditions)
+
+        outcomes: List[Optional[bool]] = [None] * self.condition_count
+
+        total_score = 0
+        for rule in self.index.candidates(features):
+            if rule.applies(features, outcomes):
+                total_score += rule.boost
+
+        if self.statistics is not None and self.statistics.sample():
+            self.statistics.record(outcomes)
+        return total_score
+
+
+@dataclass(frozen=True)
+class CompiledRuleSet:
+    """
+    Immutable scoring plan built from a user's rules.
+    With decision_diagram, tasks are scored with the rules compiled into a DecisionDiagram,
+    unless it would be too large.
+    """
+    rules: Tuple[CompiledRule, ...]
+    decision_diagram: bool = False
+
+    @cached_property
+    def symbols(self) -> SymbolTable:
+        """The encoding of the category and tag names of the conditions, built once per compiled rule set."""
+        return SymbolTable(self.condition_values('category'), self.condition_values('tag'))
+
+    @cached_property
+    def shared_conditions(self) -> Tuple[CompiledCondition, ...]:
+        """The distinct duration and time conditions of the rules, each evaluated once per task."""
+        distinct = {}
+        for rule in self.rules:
+            for condition in rule.conditions:
+                if condition.field not in NAME_FIELDS:
+                    distinct.setdefault(condition.key, condition)
+        return tuple(distinct.values())
+
+    @cached_property
+    def statistics(self) -> ConditionStatistics:
+        """Pass rates of the shared conditions, collected while scoring and used to order them at the next bind."""
+        return ConditionStatistics(len(self.shared_conditions))
+
+    @cached_property
+    def diagram(self) -> Optional[DecisionDiagram]:
+        """The rules compiled into a decision diagram, None if it is not used or would be too large."""
+        if not self.decision_diagram:
+            return None
+
+        slots = {condition.key: slot for slot, condition in enumerate(self.shared_conditions)}
+        encoded_rules = [_encode_rule(rule, self.symbols, slots) for rule in self.rules]
+        try:
+            return DecisionDiagram.build(
+                [encoded_rule for encoded_rule in encoded_rules if encoded_rule is not None], len(slots)
+            )
+        except DecisionDiagramTooLarge:
+            return None
+
+    @cached_property
+    def index(self) -> RuleIndex[CompiledRule]:
+        """The rules indexed by category and tag, built once per compiled rule set."""
+        return RuleIndex.build(self.rules, self.symbols)
+
+    def bind(self, now: datetime) -> BoundRuleSet:
+        """
+        Binds the conditions to now, so time conditions compare with absolute thresholds.
+        The conditions of each rule are ordered by the pass rates collected in the previous scoring passes.
+        """
+        symbols = self.symbols
+        bound_conditions = self._bind_conditions(now)
+        statistics = self.statistics
+        pass_rates = statistics.pass_rates()
+        return BoundRuleSet(
+            now=now,
+            symbols=symbols,
+            index=self.index.map(lambda rule: BoundRule.of(rule, symbols, bound_conditions, pass_rates=pass_rates)),
+            condition_count=len(bound_conditions),
+            statistics=statistics,
+            diagram=self.diagram,
+            conditions=tuple(bound_conditions.values()),
+        )
+
+    def _bind_conditions(self, now: datetime) -> BoundConditions:
+        """Binds each distinct condition once, in its slot."""
+        return {
+            condition.key: BoundCondition.of(condition, now, slot)
+            for slot, condition in enumerate(self.shared_conditions)
+        }
+
+    def score(self, task: Task, context: Optional['ScoringContext'] = None) -> int:
+        """
+        Sums the boosts of all the rules whose conditions apply to the task at the context's now.
+        Without a context the current instant is used.
+        """
+        if not self.rules:
+            return 0
+
+        if context is None:
+            context = ScoringContext.capture()
+        return context.bind(self).score(task)
+
+    def next_change_at(self, task: Task, now: datetime) -> Optional[datetime]:
+        """
+        Returns the first instant after now at which the task's score can change, or None if it can't.
+        Deadline and created_at conditions flip when now crosses the field value shifted by the timedelta,
+        which only matters for rules whose other conditions apply to the task.
+        """
+        if not self.rules:
+            return None
+
+        features = TaskFeatures.extract(task, self.symbols)
+        bound_conditions = None
+        outcomes: List[Optional[bool]] = [None] * len(self.shared_conditions)
+
+        next_change = None
+        for rule in self.index.candidates(features):
+            time_conditions = [condition for condition in rule.conditions if condition.field in TIME_FIELDS]
+            if not time_conditions:
+                continue
+
+            if bound_conditions is None:
+                bound_conditions = self._bind_conditions(now)
+            static_rule = BoundRule.of(rule, self.symbols, bound_conditions, fields=STATIC_FIELDS)
+            if not static_rule.applies(features, outcomes):
+                continue
+
+            for condition in time_conditions:
+                field_value = FEATURE_GETTERS[condition.field](features)
+                if field_value is None:
+                    continue
+
+                if condition.field == 'deadline':
+                    instant = field_value - condition.value
+                else:
+                    instant = field_value + condition.value
+
+                if instant > now and (next_change is None or instant < next_change):
+                    next_change = instant
+
+        return next_change
+
+    def has_time_conditions(self) -> bool:
+        """Checks if task scores can change with time, because of deadline or created_at conditions."""
+        return any(condition.field in TIME_FIELDS for rule in self.rules for condition in rule.conditions)
+
+    def max_score(self) -> int:
+        """Upper bound of the score of any task."""
+        return sum(rule.boost for rule in self.rules if rule.boost > 0)
+
+    def max_score_without_name_match(self) -> int:
+        """Upper bound of the score of tasks matching none of the category and tag conditions."""
+        return sum(
+            rule.boost for rule in self.rules
+            if rule.boost > 0 and not any(condition.field in NAME_FIELDS for condition in rule.conditions)
+        )
+
+    def condition_values(self, field: str) -> FrozenSet[Any]:
+        """Returns all values the conditions on the field are compared with."""
+        return frozenset(
+            condition.value for rule in self.rules for condition in rule.conditions
+            if condition.field == field
+        )
+
+
+def _encode_rule(rule: CompiledRule, symbols: SymbolTable,
+                 slots: Dict[Tuple[str, str, Any], int]) -> Optional[EncodedRule]:
+    """Encodes a rule for the decision diagram, or returns None if its category conditions conflict."""
+    category = None
+    tags = 0
+    rule_slots = []
+    for condition in rule.conditions:
+        if condition.field == 'category':
+            code = symbols.category_code(condition.value)
+            if category is not None and category != code:
+                return None
+            category = code
+        elif condition.field == 'tag':
+            tags |= symbols.tag_bit(condition.value)
+        else:
+            rule_slots.append(slots[condition.key])
+
+    return rule.boost, category, tags, tuple(rule_slots)
+
+
+class RuleCompiler:
+    """
+    Converts a user's Rule and Condition rows into an immutable CompiledRuleSet,
+    so condition values are parsed once instead of on every evaluation.
+    Identical conditions of different rules are compiled into the same CompiledCondition.
+    With decision_diagram, the compiled rule sets score tasks with a decision diagram.
+    """
+
+    def __init__(self, condition_evaluator: 'ConditionEvaluator', decision_diagram: bool = False):
+        self.condition_evaluator = condition_evaluator
+        self.decision_diagram = decision_diagram
+
+    def compile(self, rules: Iterable[Rule]) -> CompiledRuleSet:
+        """
+        Compiles the rules. Rules without conditions or with unsupported
+        conditions can never apply, so they are left out of the plan.
+        """
+        compiled_rules = []
+        shared_conditions: Dict[Tuple[str, str, Any], CompiledCondition] = {}
+        for rule in rules:
+            compiled_rule = self._compile_rule(rule, shared_conditions)
+            if compiled_rule is not None:
+                compiled_rules.append(compiled_rule)
+
+        return CompiledRuleSet(rules=tuple(compiled_rules), decision_diagram=self.decision_diagram)
+
+    def _compile_rule(self, rule: Rule, shared_conditions: Dict[Tuple[str, str, Any], CompiledCondition]):
+        """Compiles all rule conditions, or returns None if the rule can never apply."""
+        compiled_conditions = self.compile_conditions(rule.conditions, shared_conditions)
+        if not compiled_conditions:
+            return None
+
+        return CompiledRule(rule_id=rule.id, boost=rule.boost, conditions=compiled_conditions)
+
+    def compile_conditions(self, conditions: Iterable[Condition],
+                           shared_conditions: Optional[Dict[Tuple[str, str, Any], CompiledCondition]] = None
+                           ) -> Optional[Tuple[CompiledCondition, ...]]:
+        """
+        Compiles conditions, or returns None if any of them is not supported.
+        Conditions already in the shared conditions by key are reused, and new ones are added to them.
+        """
+        if shared_conditions is None:
+            shared_conditions = {}
+
+        compiled_conditions = []
+        for condition in conditions:
+            if not self.condition_evaluator.supports(condition.field, condition.operator):
+                return None
+
+            value = self.condition_evaluator.parse_value(condition.field, condition.value)
+            key = (condition.field, condition.operator, value)
+            compiled_condition = shared_conditions.get(key)
+            if compiled_condition is None:
+                compiled_condition = CompiledCondition(
+                    field=condition.field,
+                    operator=condition.operator,
+                    value=value,
+                    bind=partial(self.condition_evaluator.bind, condition.field, condition.operator, value),
+                )
+                shared_conditions[key] = compiled_condition
+            compiled_conditions.append(compiled_condition)
+
+        return tuple(compiled_conditions)
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from .rule_compiler import CompiledRuleSet
+
+
+class CompiledRuleSetCache:
+    """
+    Bounded LRU cache of compiled rule sets, keyed by user id.
+    Each entry stores the user's rules version it was compiled from,
+    so an entry for an older version is treated as a miss.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, Tuple[int, CompiledRuleSet]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, user_id: int, rules_version: int) -> Optional[CompiledRuleSet]:
+        """Returns the cached rule set if it was compiled from the given rules version."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != rules_version:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, rules_version: int, compiled_rules: CompiledRuleSet):
+        """Stores a compiled rule set, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[user_id] = (rules_version, compiled_rules)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        """Drops the cached rule set of a user."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        """Drops all cached rule sets and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,55 @@
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class ScoreRefreshScheduler:
+    """
+    Priority queue of the instants at which task scores change.
+    Scores are piecewise constant in time, so they only need to be refreshed
+    when the earliest scheduled transition is due, instead of periodically.
+    Rescheduling a task replaces its previous transition.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._scheduled: Dict[int, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def schedule(self, task_id: int, at: Optional[datetime]):
+        """Schedules the task's next score transition, or unschedules it if the score can't change."""
+        if at is None:
+            self._scheduled.pop(task_id, None)
+            return
+
+        if self._scheduled.get(task_id) == at:
+            return
+
+        self._scheduled[task_id] = at
+        heapq.heappush(self._heap, (at, task_id))
+
+    def next_due(self) -> Optional[datetime]:
+        """Returns the earliest scheduled transition."""
+        self._drop_replaced()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """Removes and returns the ids of the tasks whose transition is at or before now."""
+        due = []
+        self._drop_replaced()
+        while self._heap and self._heap[0][0] <= now:
+            _, task_id = heapq.heappop(self._heap)
+            del self._scheduled[task_id]
+            due.append(task_id)
+            self._drop_replaced()
+        return due
+
+    def _drop_replaced(self):
+        """Drops heap entries of tasks that were rescheduled or unscheduled since they were pushed."""
+        while self._heap:
+            at, task_id = self._heap[0]
+            if self._scheduled.get(task_id) == at:
+                return
+            heapq.heappop(self._heap)
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from typing import Callable, Dict, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .rule_compiler import CompiledRuleSet, BoundRuleSet
+
+Clock = Callable[[], datetime]
+
+
+def utc_now() -> datetime:
+    """Default clock, the current aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+class ScoringContext:
+    """
+    The instant a scoring pass compares deadlines and created_at values against.
+    It is captured once per request or batch, so all the scores of a pass are consistent,
+    and compiled rule sets are bound to it once, turning relative time conditions into absolute thresholds.
+    """
+
+    def __init__(self, now: datetime):
+        self.now = now
+        self._bound_rule_sets: Dict[int, Tuple['CompiledRuleSet', 'BoundRuleSet']] = {}
+
+    @classmethod
+    def capture(cls, clock: Clock = utc_now) -> 'ScoringContext':
+        """Creates a context with the current instant of the clock."""
+        return cls(clock())
+
+    def bind(self, compiled_rules: 'CompiledRuleSet') -> 'BoundRuleSet':
+        """Returns the rule set bound to this context's now, binding it on first use."""
+        entry = self._bound_rule_sets.get(id(compiled_rules))
+        if entry is None:
+            entry = (compiled_rules, compiled_rules.bind(self.now))
+            self._bound_rule_sets[id(compiled_rules)] = entry
+        return entry[1]
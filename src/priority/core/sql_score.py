@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import sqlalchemy as sa
+
+from src.priority.api.tasks.models import Task, Category, Tag
+from .rule_compiler import CompiledRuleSet, CompiledRule, CompiledCondition
+
+
+class SqlScoreBuilder:
+    """
+    Translates a compiled rule set into a SQL expression computing the task priority score,
+    so the database can filter and order tasks by it.
+    Every rule becomes a CASE WHEN <all conditions> THEN boost, and the score is their sum.
+    Supports the same fields and operators as ConditionEvaluator.
+    Deadline and created_at conditions compare with the scoring context's now, bound as a parameter,
+    so the database scores tasks at the same instant as the other backends.
+    """
+
+    def __init__(self):
+        self._clause_builders_map: Dict[
+            Tuple[str, str], Callable[[Any, sa.ColumnElement[datetime]], sa.ColumnElement[bool]]
+        ] = {
+            ('category', 'equals'): self._category_equals,
+            ('tag', 'equals'): self._tag_equals,
+            ('duration', 'less_than'): self._duration_less_than,
+            ('duration', 'greater_than'): self._duration_greater_than,
+            ('deadline', 'less_than'): self._deadline_less_than,
+            ('deadline', 'greater_than'): self._deadline_greater_than,
+            ('created_at', 'less_than'): self._created_at_less_than,
+            ('created_at', 'greater_than'): self._created_at_greater_than,
+        }
+
+    def build(self, compiled_rules: CompiledRuleSet, now: datetime) -> sa.ColumnElement[int]:
+        """Builds the priority score expression for the Task entity, scored at now."""
+        now_clause = sa.literal(now, sa.DateTime(timezone=True))
+        cases = [self._rule_case(rule, now_clause) for rule in compiled_rules.rules]
+
+        if not cases:
+            return sa.literal(0, sa.Integer)
+
+        return sum(cases[1:], cases[0])
+
+    def conditions_clause(self, conditions: Iterable[CompiledCondition],
+                          now: Optional[datetime] = None) -> sa.ColumnElement[bool]:
+        """
+        Builds the expression checking that all the conditions apply to the task at now.
+        Without now, time conditions compare with the database's current time.
+        """
+        now_clause = sa.func.now() if now is None else sa.literal(now, sa.DateTime(timezone=True))
+        return self._conditions_clause(conditions, now_clause)
+
+    def _conditions_clause(self, conditions: Iterable[CompiledCondition],
+                           now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        return sa.and_(sa.true(), *(self._condition_clause(condition, now) for condition in conditions))
+
+    def _rule_case(self, rule: CompiledRule, now: sa.ColumnElement[datetime]) -> sa.ColumnElement[int]:
+        """Builds the boost expression of a rule which applies if all of its conditions apply"""
+        return sa.case((self._conditions_clause(rule.conditions, now), rule.boost), else_=0)
+
+    def _condition_clause(self, condition: CompiledCondition,
+                          now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        """Calls the specific clause builder based on the condition field and operator"""
+        clause_builder = self._clause_builders_map[(condition.field, condition.operator)]
+        return clause_builder(condition.value, now)
+
+    def _category_equals(self, value: str, now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        """Checks if the category matches"""
+        return Task.category.has(Category.name == value)
+
+    def _tag_equals(self, value: str, now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        """Checks if the task has a tag with the name, tag names are stored as given so they are lowercased"""
+        return Task.tags.any(sa.func.lower(Tag.name) == value)
+
+    def _duration_less_than(self, value: timedelta, now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        """Checks if the duration is less than or equal to the given timedelta"""
+        return Task.duration <= value
+
+    def _duration_greater_than(self, value: timedelta, now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        """Checks if the duration is greater than the given timedelta"""
+        return Task.duration > value
+
+    def _deadline_less_than(self, value: timedelta, now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        """Checks if the deadline is within the timedelta from now."""
+        return Task.deadline <= now + value
+
+    def _deadline_greater_than(self, value: timedelta, now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        """Checks if the deadline is later than the timedelta from now."""
+        return Task.deadline > now + value
+
+    def _created_at_greater_than(self, value: timedelta, now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        """Checks if created_at is more than timedelta from now in the past"""
+        return Task.created_at <= now - value
+
+    def _created_at_less_than(self, value: timedelta, now: sa.ColumnElement[datetime]) -> sa.ColumnElement[bool]:
+        """Checks if created_at is within timedelta from now in the past"""
+        return Task.created_at > now - value
@@ -0,0 +1,44 @@
+from typing import Dict, Iterable, Optional
+
+# Code of a missing category, or of one no condition compares with.
+NO_CATEGORY = -1
+
+
+def normalize_name(name: str) -> str:
+    """Normalizes a category or tag name for comparisons, names are compared case insensitively."""
+    return name.lower()
+
+
+class SymbolTable:
+    """
+    Dictionary encoding of the category and tag names a user's rules compare with.
+    Categories are encoded as small integers and tags as bits, so a task's tags are an integer bitmask
+    and a rule's tag conditions are a mask of required bits, checked with a single AND.
+    Names no condition refers to can't make a condition apply, so they are not encoded.
+    """
+
+    def __init__(self, category_names: Iterable[str], tag_names: Iterable[str]):
+        self.category_codes: Dict[str, int] = {
+            name: code for code, name in enumerate(sorted({normalize_name(name) for name in category_names}))
+        }
+        self.tag_codes: Dict[str, int] = {
+            name: code for code, name in enumerate(sorted({normalize_name(name) for name in tag_names}))
+        }
+
+    def category_code(self, name: Optional[str]) -> int:
+        """Encodes a category name, NO_CATEGORY for a missing or unknown one."""
+        if name is None:
+            return NO_CATEGORY
+        return self.category_codes.get(normalize_name(name), NO_CATEGORY)
+
+    def tag_bit(self, name: str) -> int:
+        """Encodes a tag name as its bit, 0 for an unknown one."""
+        code = self.tag_codes.get(normalize_name(name))
+        return 0 if code is None else 1 << code
+
+    def tags_mask(self, names: Iterable[str]) -> int:
+        """Encodes tag names as the bitmask of their bits."""
+        mask = 0
+        for name in names:
+            mask |= self.tag_bit(name)
+        return mask
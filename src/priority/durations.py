@@ -0,0 +1,77 @@
+import re
+from datetime import timedelta
+from functools import lru_cache
+
+from pydantic import TypeAdapter
+
+PARSED_DURATIONS_CACHE_SIZE = 4096
+
+_ISO_8601_DURATION = re.compile(
+    r'(?P<sign>[-+])?P'
+    r'(?:(?P<years>\d+(?:[.,]\d+)?)Y)?'
+    r'(?:(?P<months>\d+(?:[.,]\d+)?)M)?'
+    r'(?:(?P<weeks>\d+(?:[.,]\d+)?)W)?'
+    r'(?:(?P<days>\d+(?:[.,]\d+)?)D)?'
+    r'(?:T'
+    r'(?:(?P<hours>\d+(?:[.,]\d+)?)H)?'
+    r'(?:(?P<minutes>\d+(?:[.,]\d+)?)M)?'
+    r'(?:(?P<seconds>\d+(?:[.,]\d+)?)S)?'
+    r')?'
+)
+
+# Same lengths as pydantic uses for the calendar units of ISO 8601 durations.
+_UNIT_DAYS = {
+    'years': 365,
+    'months': 30,
+    'weeks': 7,
+    'days': 1,
+}
+_UNIT_SECONDS = {
+    'hours': 3600,
+    'minutes': 60,
+    'seconds': 1,
+}
+
+_timedelta_adapter = TypeAdapter(timedelta)
+
+
+@lru_cache(maxsize=PARSED_DURATIONS_CACHE_SIZE)
+def parse_duration(value: str) -> timedelta:
+    """
+    Parses a duration string into a timedelta.
+    ISO 8601 durations like 'P1DT2H' are parsed directly, any other format
+    accepted by pydantic (like '1 day, 02:00:00') falls back to its timedelta validation,
+    which raises a ValidationError for invalid values.
+    Parsed values are cached, since rules reuse a small set of durations.
+    """
+    duration = _parse_iso_8601_duration(value)
+    if duration is not None:
+        return duration
+
+    return _timedelta_adapter.validate_python(value)
+
+
+def _parse_iso_8601_duration(value: str):
+    """Parses an ISO 8601 duration, or returns None if the value is not one."""
+    match = _ISO_8601_DURATION.fullmatch(value)
+    if match is None:
+        return None
+
+    components = match.groupdict()
+    if all(components[unit] is None for unit in (*_UNIT_DAYS, *_UNIT_SECONDS)):
+        return None
+
+    days = sum(_number(components[unit]) * length for unit, length in _UNIT_DAYS.items())
+    seconds = sum(_number(components[unit]) * length for unit, length in _UNIT_SECONDS.items())
+    duration = timedelta(days=days, seconds=seconds)
+
+    return -duration if components['sign'] == '-' else duration
+
+
+def _number(component):
+    """Converts a matched duration component to a number, where a missing one is zero."""
+    if component is None:
+        return 0
+    if '.' in component or ',' in component:
+        return float(component.replace(',', '.'))
+    return int(component)
@@ -0,0 +1,30 @@
+from typing import Any
+
+import pydantic_core
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel
+
+
+class PydanticJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with pydantic's serializer instead of the stdlib encoder.
+    Pydantic models are dumped straight to JSON bytes without building an intermediate dict,
+    and other values are encoded the same way pydantic encodes model fields,
+    so datetimes and timedeltas are ISO 8601 strings in all responses.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serializes the data as a JSON string."""
+        return self._dump_bytes(obj).decode()
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Serializes the data like dumps and wraps it in a JSON response, without an extra decode."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dump_bytes(obj), mimetype=self.mimetype)
+
+    @staticmethod
+    def _dump_bytes(obj: Any) -> bytes:
+        """Encodes a pydantic model or plain data as JSON bytes."""
+        if isinstance(obj, BaseModel):
+            return obj.__pydantic_serializer__.to_json(obj)
+        return pydantic_core.to_json(obj)
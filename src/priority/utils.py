@@ -1,12 +1,8 @@
 from datetime import timedelta
 from typing import Optional
 
-from pydantic import BaseModel, ValidationError
+from src.priority.durations import parse_duration
 
 
 def parse_timedelta(time_str: str) -> Optional[timedelta]:
-    class TimedeltaParser(BaseModel):
-        timedelta: timedelta
-
-    parser = TimedeltaParser(timedelta=time_str)
-    return parser.timedelta
+    return parse_duration(time_str)
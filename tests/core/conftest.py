@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import Mock
+
+
+@pytest.fixture
+def make_rule():
+    """Factory of mock rules, with conditions given as (field, operator, value) triples."""
+    def make(rule_id, boost, conditions):
+        rule = Mock()
+        rule.id = rule_id
+        rule.boost = boost
+        rule.conditions = [
+            Mock(field=field, operator=operator, value=value)
+            for field, operator, value in conditions
+        ]
+        return rule
+
+    return make
+
+
+@pytest.fixture
+def make_task():
+    """Factory of mock tasks, with the category and tags given by name."""
+    def make(category=None, tags=(), duration=None, deadline=None, created_at=None):
+        task = Mock()
+        task.category = None
+        if category:
+            task.category = Mock()
+            task.category.name = category
+        task.tags = []
+        for tag_name in tags:
+            tag = Mock()
+            tag.name = tag_name
+            task.tags.append(tag)
+        task.duration = duration
+        task.deadline = deadline
+        task.created_at = created_at
+        return task
+
+    return make
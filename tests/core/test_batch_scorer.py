@@ -0,0 +1,62 @@
+import random
+import pytest
+from datetime import datetime, timezone, timedelta
+
+from src.priority.core import BatchScorer, ConditionEvaluator, RuleCompiler, ScoringContext, TaskColumns
+
+
+class TestBatchScorer:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, make_rule, make_task):
+        self.make_rule = make_rule
+        self.make_task = make_task
+        self.scorer = BatchScorer()
+        self.compiler = RuleCompiler(ConditionEvaluator())
+        self.now = datetime.now(timezone.utc)
+
+    def _rules(self):
+        return self.compiler.compile([
+            self.make_rule(1, 5, [('category', 'equals', 'work')]),
+            self.make_rule(2, 10, [('tag', 'equals', 'urgent'), ('deadline', 'less_than', 'P1D')]),
+            self.make_rule(3, -3, [('duration', 'greater_than', 'PT2H')]),
+            self.make_rule(4, 7, [('duration', 'less_than', 'PT30M'), ('created_at', 'greater_than', 'P2D')]),
+            self.make_rule(5, 1, [('deadline', 'greater_than', 'P3D'), ('created_at', 'less_than', 'P1D')]),
+        ])
+
+    def test_score_matches_compiled_rule_set(self):
+        rng = random.Random(7)
+        tasks = [
+            self.make_task(
+                category=rng.choice([None, 'work', 'home']),
+                tags=rng.sample(['urgent', 'Urgent', 'later', 'misc'], rng.randint(0, 4)),
+                duration=rng.choice([None, timedelta(minutes=rng.randint(0, 300))]),
+                deadline=rng.choice([None, self.now + timedelta(hours=rng.randint(-48, 120))]),
+                created_at=self.now - timedelta(hours=rng.randint(0, 100)),
+            )
+            for _ in range(200)
+        ]
+        compiled_rules = self._rules()
+
+        scores = self.scorer.score(tasks, compiled_rules, self.now)
+
+        context = ScoringContext(self.now)
+        assert scores.tolist() == [compiled_rules.score(task, context) for task in tasks]
+
+    def test_score_no_rules(self):
+        scores = self.scorer.score([self.make_task()], self.compiler.compile([]), self.now)
+
+        assert scores.tolist() == [0]
+
+    def test_next_change_at_matches_compiled_rule_set(self):
+        tasks = [
+            self.make_task(tags=['urgent'], deadline=self.now + timedelta(days=3)),
+            self.make_task(deadline=self.now + timedelta(days=5), created_at=self.now - timedelta(hours=2)),
+            self.make_task(created_at=self.now),
+        ]
+        compiled_rules = self._rules()
+        columns = TaskColumns(tasks, compiled_rules)
+
+        assert self.scorer.next_change_at(columns, compiled_rules, self.now) == [
+            compiled_rules.next_change_at(task, self.now) for task in tasks
+        ]
@@ -1,7 +1,7 @@
 import pytest
 from datetime import datetime, timezone, timedelta
 
-from src.priority.core import ConditionEvaluator
+from src.priority.core import ConditionEvaluator, ScoringContext
 
 class TestConditionEvaluator:
 
@@ -104,3 +104,17 @@ class TestConditionEvaluator:
     def test_unsupported_operator(self):
         result = self.evaluator.evaluate('category', 'work', 'unknown', 'work')
         assert result is False
+
+    def test_deadline_less_than_at_context_now(self):
+        context = ScoringContext(datetime(2025, 1, 1, 12, tzinfo=timezone.utc))
+        deadline = datetime(2025, 1, 1, 14, tzinfo=timezone.utc)
+
+        assert self.evaluator.evaluate('deadline', deadline, 'less_than', 'PT2H', context) is True
+        assert self.evaluator.evaluate('deadline', deadline, 'greater_than', 'PT2H', context) is False
+
+    def test_created_at_uses_injected_clock(self):
+        evaluator = ConditionEvaluator(clock=lambda: datetime(2025, 1, 1, 12, tzinfo=timezone.utc))
+        created_at = datetime(2025, 1, 1, 10, tzinfo=timezone.utc)
+
+        assert evaluator.evaluate('created_at', created_at, 'greater_than', 'PT2H') is True
+        assert evaluator.evaluate('created_at', created_at, 'less_than', 'PT2H') is False
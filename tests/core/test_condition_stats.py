@@ -0,0 +1,34 @@
+import pytest
+
+from src.priority.core import ConditionStatistics
+
+
+class TestConditionStatistics:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.statistics = ConditionStatistics(3, sample_every=2, max_evaluations=8)
+
+    def test_sample_every(self):
+        assert [self.statistics.sample() for _ in range(6)] == [False, True, False, True, False, True]
+
+    def test_record_skips_unevaluated_conditions(self):
+        self.statistics.record([True, None, False])
+        self.statistics.record([True, False, None])
+
+        assert self.statistics.evaluated == [2, 1, 1]
+        assert self.statistics.passed == [2, 0, 0]
+
+    def test_pass_rates_are_smoothed(self):
+        self.statistics.record([True, False, None])
+
+        assert self.statistics.pass_rates() == [2 / 3, 1 / 3, 1 / 2]
+
+    def test_counts_are_halved(self):
+        for _ in range(6):
+            self.statistics.record([True, None, None])
+        self.statistics.record([False, None, None])
+        self.statistics.record([False, None, None])
+
+        assert self.statistics.evaluated[0] == 4
+        assert self.statistics.passed[0] == 3
@@ -0,0 +1,86 @@
+import random
+import pytest
+from datetime import datetime, timezone, timedelta
+
+from src.priority.core import decision_diagram
+from src.priority.core import ConditionEvaluator, RuleCompiler, ScoringContext, DecisionDiagram, DecisionDiagramTooLarge
+
+
+class TestDecisionDiagram:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, make_rule, make_task):
+        self.make_rule = make_rule
+        self.make_task = make_task
+        self.compiler = RuleCompiler(ConditionEvaluator())
+        self.diagram_compiler = RuleCompiler(ConditionEvaluator(), decision_diagram=True)
+        self.now = datetime.now(timezone.utc)
+
+    def _random_rules(self, rng, count):
+        conditions = [
+            ('category', 'equals', 'work'), ('category', 'equals', 'home'),
+            ('tag', 'equals', 'urgent'), ('tag', 'equals', 'later'), ('tag', 'equals', 'review'),
+            ('duration', 'less_than', 'PT1H'), ('duration', 'greater_than', 'PT2H'),
+            ('deadline', 'less_than', 'P1D'), ('created_at', 'greater_than', 'P2D'),
+        ]
+        return [
+            self.make_rule(rule_id, rng.randint(-5, 20), rng.sample(conditions, rng.randint(1, 3)))
+            for rule_id in range(count)
+        ]
+
+    def _random_task(self, rng):
+        return self.make_task(
+            category=rng.choice([None, 'work', 'home', 'other']),
+            tags=rng.sample(['urgent', 'later', 'review', 'misc'], rng.randint(0, 4)),
+            duration=rng.choice([None, timedelta(minutes=rng.randint(0, 300))]),
+            deadline=rng.choice([None, self.now + timedelta(hours=rng.randint(-48, 120))]),
+            created_at=self.now - timedelta(hours=rng.randint(0, 100)),
+        )
+
+    def test_score_matches_rules(self):
+        rng = random.Random(3)
+        rules = self._random_rules(rng, 60)
+        compiled_rules = self.compiler.compile(rules)
+        diagram_rules = self.diagram_compiler.compile(rules)
+        context = ScoringContext(self.now)
+
+        assert diagram_rules.diagram is not None
+        for _ in range(300):
+            task = self._random_task(rng)
+            assert diagram_rules.score(task, context) == compiled_rules.score(task, context)
+
+    def test_shares_nodes(self):
+        compiled = self.diagram_compiler.compile([
+            self.make_rule(rule_id, 1, [('tag', 'equals', f'tag{rule_id}')]) for rule_id in range(50)
+        ])
+
+        assert compiled.diagram.size == 50
+        assert compiled.score(self.make_task(tags=['tag3', 'tag40'])) == 2
+
+    def test_category_switch(self):
+        compiled = self.diagram_compiler.compile([
+            self.make_rule(1, 5, [('category', 'equals', 'work')]),
+            self.make_rule(2, 10, [('category', 'equals', 'work'), ('category', 'equals', 'home')]),
+            self.make_rule(3, 20, [('tag', 'equals', 'urgent')]),
+        ])
+
+        assert compiled.score(self.make_task(category='work', tags=['urgent'])) == 25
+        assert compiled.score(self.make_task(category='home', tags=['urgent'])) == 20
+        assert compiled.score(self.make_task()) == 0
+
+    def test_build_too_large(self):
+        rules = [(1, None, 1 << tag, ()) for tag in range(10)]
+
+        assert DecisionDiagram.build(rules, slot_count=0, max_nodes=10).size == 10
+        with pytest.raises(DecisionDiagramTooLarge):
+            DecisionDiagram.build(rules, slot_count=0, max_nodes=9)
+
+    def test_too_large_falls_back_to_rules(self, monkeypatch):
+        monkeypatch.setattr(decision_diagram, 'MAX_DIAGRAM_NODES', 1)
+        compiled = self.diagram_compiler.compile([
+            self.make_rule(1, 5, [('tag', 'equals', 'urgent')]),
+            self.make_rule(2, 10, [('tag', 'equals', 'later')]),
+        ])
+
+        assert compiled.diagram is None
+        assert compiled.score(self.make_task(tags=['urgent', 'later'])) == 15
@@ -1,15 +1,24 @@
 import pytest
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock
 
-from src.priority.core import PriorityCalculator
+from src.priority.core import PriorityCalculator, ConditionEvaluator, CompiledRuleSetCache, ScoringContext
 
 class TestPriorityCalculator:
 
     @pytest.fixture(autouse=True)
-    def setup(self):
-        self.condition_evaluator = Mock()
+    def setup(self, make_rule, make_task):
+        self.make_rule = make_rule
+        self.make_task = make_task
+        self.condition_evaluator = ConditionEvaluator()
         self.calculator = PriorityCalculator(self.condition_evaluator)
 
+    def _make_task(self, rules, category='work', tags=()):
+        task = self.make_task(category=category, tags=tags)
+        task.user = Mock()
+        task.user.rules = rules
+        return task
+
     def test_calculate_task_score_no_user(self):
         task = Mock()
         task.user = None
@@ -18,63 +27,84 @@ class TestPriorityCalculator:
         assert score == 0
 
     def test_calculate_task_score_no_rules(self):
-        user = Mock()
-        user.rules = []
-        task = Mock()
-        task.user = user
+        task = self._make_task(rules=[])
 
         score = self.calculator.calculate_task_score(task)
         assert score == 0
 
     def test_calculate_task_score_rules_apply(self):
-        rule1 = Mock()
-        rule1.boost = 10
-        rule1.conditions = [Mock()]
-
-        rule2 = Mock()
-        rule2.boost = 5
-        rule2.conditions = [Mock()]
-
-        user = Mock()
-        user.rules = [rule1, rule2]
-
-        task = Mock()
-        task.user = user
-
-        # Mock _rule_applies to return True for both rules
-        self.calculator._rule_applies = Mock(return_value=True)
+        rule1 = self.make_rule(1, 10, [('category', 'equals', 'work')])
+        rule2 = self.make_rule(2, 5, [('tag', 'equals', 'urgent')])
+        task = self._make_task(rules=[rule1, rule2], tags=['urgent'])
 
         score = self.calculator.calculate_task_score(task)
         assert score == 15
 
-    def test_rule_applies_no_conditions(self):
-        rule = Mock()
-        rule.conditions = []
-        task = Mock()
+    def test_rule_no_conditions(self):
+        rule = self.make_rule(1, 10, [])
+        task = self._make_task(rules=[rule])
 
-        result = self.calculator._rule_applies(task, rule)
-        assert result is False
+        score = self.calculator.calculate_task_score(task)
+        assert score == 0
 
-    def test_rule_applies_all_conditions_match(self):
-        condition1 = Mock()
-        condition2 = Mock()
-        rule = Mock()
-        rule.conditions = [condition1, condition2]
-        task = Mock()
+    def test_rule_some_conditions_fail(self):
+        rule = self.make_rule(1, 10, [('category', 'equals', 'work'), ('tag', 'equals', 'urgent')])
+        task = self._make_task(rules=[rule], tags=['important'])
+
+        score = self.calculator.calculate_task_score(task)
+        assert score == 0
 
-        self.calculator._condition_applies = Mock(return_value=True)
+    def test_calculate_task_score_with_compiled_rules(self):
+        rule = self.make_rule(1, 10, [('category', 'equals', 'work')])
+        task = self._make_task(rules=[])
+        compiled_rules = self.calculator.rule_compiler.compile([rule])
 
-        result = self.calculator._rule_applies(task, rule)
-        assert result is True
+        score = self.calculator.calculate_task_score(task, compiled_rules)
+        assert score == 10
 
-    def test_rule_applies_some_conditions_fail(self):
-        condition1 = Mock()
-        condition2 = Mock()
-        rule = Mock()
-        rule.conditions = [condition1, condition2]
-        task = Mock()
+    def test_compile_user_rules_uses_cache(self):
+        ruleset_cache = CompiledRuleSetCache()
+        calculator = PriorityCalculator(self.condition_evaluator, ruleset_cache)
+        user = Mock(id=1, rules_version=0)
+        user.rules = [self.make_rule(1, 10, [('category', 'equals', 'work')])]
 
-        self.calculator._condition_applies = Mock(side_effect=[True, False])
+        compiled_rules = calculator.compile_user_rules(user)
+        user.rules = []
 
-        result = self.calculator._rule_applies(task, rule)
-        assert result is False
+        assert calculator.compile_user_rules(user) is compiled_rules
+        assert ruleset_cache.hits == 1
+        assert ruleset_cache.misses == 1
+
+        user.rules_version = 1
+        assert calculator.compile_user_rules(user).rules == ()
+
+    def test_calculate_task_score_at_context_now(self):
+        rule = self.make_rule(1, 10, [('deadline', 'less_than', 'P1D')])
+        task = self._make_task([rule])
+        task.deadline = datetime(2025, 1, 2, tzinfo=timezone.utc)
+        compiled_rules = self.calculator.rule_compiler.compile([rule])
+
+        assert self.calculator.calculate_task_score(
+            task, compiled_rules, ScoringContext(datetime(2025, 1, 1, tzinfo=timezone.utc))
+        ) == 10
+        assert self.calculator.calculate_task_score(
+            task, compiled_rules, ScoringContext(datetime(2024, 12, 31, tzinfo=timezone.utc))
+        ) == 0
+
+    def test_scoring_context_captures_clock_once(self):
+        clock = Mock(side_effect=[
+            datetime(2025, 1, 1, tzinfo=timezone.utc),
+            datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(hours=1),
+        ])
+        calculator = PriorityCalculator(self.condition_evaluator, clock=clock)
+        rule = self.make_rule(1, 10, [('created_at', 'less_than', 'PT1H')])
+        compiled_rules = calculator.rule_compiler.compile([rule])
+        tasks = [self._make_task([rule]) for _ in range(3)]
+        for task in tasks:
+            task.created_at = datetime(2024, 12, 31, 23, 30, tzinfo=timezone.utc)
+
+        context = calculator.scoring_context()
+        scores = [calculator.calculate_task_score(task, compiled_rules, context) for task in tasks]
+
+        assert scores == [10, 10, 10]
+        assert clock.call_count == 1
@@ -0,0 +1,213 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+
+from src.priority.core import ConditionEvaluator, RuleCompiler, TaskFeatures, SymbolTable, ScoringContext, NO_CATEGORY
+
+
+class TestRuleCompiler:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, make_rule, make_task):
+        self.make_rule = make_rule
+        self.make_task = make_task
+        self.compiler = RuleCompiler(ConditionEvaluator())
+
+    def test_compile_parses_values_once(self):
+        rule = self.make_rule(1, 5, [('duration', 'less_than', 'PT2H'), ('category', 'equals', 'WORK')])
+
+        compiled = self.compiler.compile([rule])
+
+        assert len(compiled.rules) == 1
+        assert compiled.rules[0].rule_id == 1
+        assert compiled.rules[0].boost == 5
+        assert [c.field for c in compiled.rules[0].conditions] == ['duration', 'category']
+
+    def test_compile_skips_rules_without_conditions(self):
+        compiled = self.compiler.compile([self.make_rule(1, 5, [])])
+
+        assert compiled.rules == ()
+
+    def test_compile_skips_rules_with_unsupported_conditions(self):
+        rule = self.make_rule(1, 5, [('category', 'equals', 'work'), ('category', 'less_than', 'work')])
+
+        compiled = self.compiler.compile([rule])
+
+        assert compiled.rules == ()
+
+    def test_score_sums_applying_rules(self):
+        rules = [
+            self.make_rule(1, 5, [('category', 'equals', 'Work')]),
+            self.make_rule(2, 10, [('tag', 'equals', 'urgent'), ('duration', 'greater_than', 'PT1H')]),
+            self.make_rule(3, 20, [('deadline', 'less_than', 'P1D')]),
+        ]
+        compiled = self.compiler.compile(rules)
+        task = self.make_task(
+            category='work',
+            tags=['urgent'],
+            duration=timedelta(hours=2),
+            deadline=datetime.now(timezone.utc) + timedelta(days=3),
+        )
+
+        assert compiled.score(task) == 15
+
+    def test_score_missing_field_value_does_not_apply(self):
+        compiled = self.compiler.compile([self.make_rule(1, 5, [('deadline', 'greater_than', 'PT1H')])])
+        task = self.make_task(deadline=None)
+
+        assert compiled.score(task) == 0
+
+    def test_next_change_at_deadline_and_created_at(self):
+        now = datetime.now(timezone.utc)
+        rules = [
+            self.make_rule(1, 5, [('deadline', 'less_than', 'P1D'), ('category', 'equals', 'work')]),
+            self.make_rule(2, 5, [('created_at', 'less_than', 'PT2H')]),
+        ]
+        compiled = self.compiler.compile(rules)
+        task = self.make_task(category='work', deadline=now + timedelta(days=3), created_at=now)
+
+        assert compiled.next_change_at(task, now) == now + timedelta(hours=2)
+
+        task.created_at = now - timedelta(days=1)
+        assert compiled.next_change_at(task, now) == now + timedelta(days=2)
+
+        task.deadline = now + timedelta(hours=1)
+        assert compiled.next_change_at(task, now) is None
+
+    def test_next_change_at_ignores_rules_with_failing_static_conditions(self):
+        now = datetime.now(timezone.utc)
+        compiled = self.compiler.compile([
+            self.make_rule(1, 5, [('deadline', 'less_than', 'P1D'), ('category', 'equals', 'work')]),
+        ])
+        task = self.make_task(category='personal', deadline=now + timedelta(days=3))
+
+        assert compiled.next_change_at(task, now) is None
+
+    def test_index_by_category_then_tag(self):
+        compiled = self.compiler.compile([
+            self.make_rule(1, 5, [('tag', 'equals', 'urgent'), ('category', 'equals', 'work')]),
+            self.make_rule(2, 5, [('tag', 'equals', 'urgent'), ('tag', 'equals', 'review')]),
+            self.make_rule(3, 5, [('duration', 'less_than', 'PT1H')]),
+        ])
+        symbols = compiled.symbols
+
+        index = compiled.index
+
+        assert [rule.rule_id for rule in index.by_category[symbols.category_code('work')]] == [1]
+        assert [rule.rule_id for rule in index.by_tag[symbols.tag_bit('urgent')]] == [2]
+        assert symbols.tag_bit('review') not in index.by_tag
+        assert [rule.rule_id for rule in index.unindexed] == [3]
+
+    def test_index_candidates_skip_other_names(self):
+        compiled = self.compiler.compile([
+            self.make_rule(1, 5, [('category', 'equals', 'work')]),
+            self.make_rule(2, 5, [('category', 'equals', 'home')]),
+            self.make_rule(3, 5, [('tag', 'equals', 'urgent')]),
+            self.make_rule(4, 5, [('tag', 'equals', 'later')]),
+            self.make_rule(5, 5, [('duration', 'less_than', 'PT1H')]),
+        ])
+        features = TaskFeatures.extract(self.make_task(category='work', tags=['urgent', 'other']), compiled.symbols)
+
+        candidates = compiled.index.candidates(features)
+
+        assert sorted(rule.rule_id for rule in candidates) == [1, 3, 5]
+
+    def test_score_with_index_matches_all_rules(self):
+        rules = [
+            self.make_rule(1, 1, [('category', 'equals', 'work'), ('tag', 'equals', 'urgent')]),
+            self.make_rule(2, 2, [('category', 'equals', 'work'), ('duration', 'less_than', 'PT1H')]),
+            self.make_rule(3, 4, [('tag', 'equals', 'urgent')]),
+            self.make_rule(4, 8, [('tag', 'equals', 'review'), ('tag', 'equals', 'urgent')]),
+            self.make_rule(5, 16, [('duration', 'greater_than', 'PT1H')]),
+            self.make_rule(6, 32, [('category', 'equals', 'home')]),
+        ]
+        compiled = self.compiler.compile(rules)
+        task = self.make_task(category='work', tags=['urgent', 'review'], duration=timedelta(hours=2))
+
+        assert compiled.score(task) == 1 + 4 + 8 + 16
+
+    def test_extract_features(self):
+        created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        task = self.make_task(category='work', tags=['Urgent', 'review', 'other'], duration=timedelta(hours=1),
+                               created_at=created_at)
+        symbols = SymbolTable(['work'], ['urgent', 'review'])
+
+        features = TaskFeatures.extract(task, symbols)
+
+        assert features == TaskFeatures(
+            category=symbols.category_code('work'),
+            tags=symbols.tag_bit('urgent') | symbols.tag_bit('review'),
+            duration=timedelta(hours=1),
+            deadline=None,
+            created_at=created_at,
+        )
+        assert TaskFeatures.extract(self.make_task(), symbols).category == NO_CATEGORY
+
+    def test_score_tags_case_insensitive(self):
+        compiled = self.compiler.compile([
+            self.make_rule(1, 5, [('tag', 'equals', 'Urgent')]),
+            self.make_rule(2, 10, [('tag', 'equals', 'urgent'), ('tag', 'equals', 'review')]),
+        ])
+
+        assert compiled.score(self.make_task(tags=['URGENT'])) == 5
+        assert compiled.score(self.make_task(tags=['urgent', 'Review'])) == 15
+
+    def test_score_conflicting_categories_never_apply(self):
+        compiled = self.compiler.compile([
+            self.make_rule(1, 5, [('category', 'equals', 'work'), ('category', 'equals', 'home')]),
+            self.make_rule(2, 10, [('category', 'equals', 'work'), ('category', 'equals', 'Work')]),
+        ])
+
+        assert compiled.score(self.make_task(category='work')) == 10
+
+    def test_compile_shares_identical_conditions(self):
+        compiled = self.compiler.compile([
+            self.make_rule(1, 5, [('category', 'equals', 'work'), ('duration', 'less_than', 'PT1H')]),
+            self.make_rule(2, 5, [('tag', 'equals', 'urgent'), ('duration', 'less_than', 'PT60M')]),
+            self.make_rule(3, 5, [('duration', 'less_than', 'PT2H'), ('category', 'equals', 'WORK')]),
+        ])
+
+        assert compiled.rules[0].conditions[0] is compiled.rules[2].conditions[1]
+        assert compiled.rules[0].conditions[1] is compiled.rules[1].conditions[1]
+        assert [condition.value for condition in compiled.shared_conditions] == [
+            timedelta(hours=1), timedelta(hours=2)
+        ]
+
+    def test_score_evaluates_shared_conditions_once(self):
+        evaluated = []
+
+        class CountingEvaluator(ConditionEvaluator):
+            def _duration_less_than(self, duration, value):
+                evaluated.append(value)
+                return super()._duration_less_than(duration, value)
+
+        compiled = RuleCompiler(CountingEvaluator()).compile([
+            self.make_rule(rule_id, 1, [('tag', 'equals', f'tag{rule_id}'), ('duration', 'less_than', 'PT1H')])
+            for rule_id in range(5)
+        ] + [self.make_rule(5, 10, [('duration', 'less_than', 'PT2H')])])
+        task = self.make_task(tags=[f'tag{rule_id}' for rule_id in range(5)], duration=timedelta(minutes=30))
+
+        assert compiled.score(task) == 15
+        assert sorted(evaluated) == [timedelta(hours=1), timedelta(hours=2)]
+
+    def test_bind_orders_conditions_by_failure_rate(self):
+        compiled = self.compiler.compile([
+            self.make_rule(1, 5, [
+                ('tag', 'equals', 'urgent'),
+                ('duration', 'less_than', 'PT1H'),
+                ('deadline', 'less_than', 'P1D'),
+            ]),
+        ])
+        now = datetime.now(timezone.utc)
+
+        fields = [condition.field for condition in compiled.bind(now).index.by_tag[1][0].conditions]
+        assert fields == ['duration', 'deadline']
+
+        short_tasks = [
+            self.make_task(tags=['urgent'], duration=timedelta(minutes=10), deadline=now + timedelta(days=5))
+            for _ in range(compiled.statistics.sample_every * 4)
+        ]
+        context = ScoringContext(now)
+        assert [compiled.score(task, context) for task in short_tasks] == [0] * len(short_tasks)
+
+        fields = [condition.field for condition in compiled.bind(now).index.by_tag[1][0].conditions]
+        assert fields == ['deadline', 'duration']
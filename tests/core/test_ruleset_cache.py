@@ -0,0 +1,52 @@
+import pytest
+
+from src.priority.core import CompiledRuleSetCache, CompiledRuleSet
+
+
+class TestCompiledRuleSetCache:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.cache = CompiledRuleSetCache(max_size=2)
+        self.ruleset = CompiledRuleSet(rules=())
+
+    def test_get_miss(self):
+        assert self.cache.get(1, 0) is None
+        assert self.cache.misses == 1
+        assert self.cache.hits == 0
+
+    def test_get_hit(self):
+        self.cache.put(1, 0, self.ruleset)
+
+        assert self.cache.get(1, 0) is self.ruleset
+        assert self.cache.hits == 1
+
+    def test_get_stale_version_is_miss(self):
+        self.cache.put(1, 0, self.ruleset)
+
+        assert self.cache.get(1, 1) is None
+        assert self.cache.misses == 1
+
+    def test_invalidate(self):
+        self.cache.put(1, 0, self.ruleset)
+        self.cache.invalidate(1)
+
+        assert self.cache.get(1, 0) is None
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put(1, 0, self.ruleset)
+        self.cache.put(2, 0, self.ruleset)
+        self.cache.get(1, 0)
+        self.cache.put(3, 0, self.ruleset)
+
+        assert self.cache.get(2, 0) is None
+        assert self.cache.get(1, 0) is self.ruleset
+        assert self.cache.get(3, 0) is self.ruleset
+        assert self.cache.stats()['size'] == 2
+
+    def test_clear(self):
+        self.cache.put(1, 0, self.ruleset)
+        self.cache.get(1, 0)
+        self.cache.clear()
+
+        assert self.cache.stats() == {'size': 0, 'max_size': 2, 'hits': 0, 'misses': 0}
@@ -0,0 +1,40 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+
+from src.priority.core import ScoreRefreshScheduler
+
+
+class TestScoreRefreshScheduler:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.scheduler = ScoreRefreshScheduler()
+        self.now = datetime.now(timezone.utc)
+
+    def test_empty(self):
+        assert self.scheduler.next_due() is None
+        assert self.scheduler.pop_due(self.now) == []
+
+    def test_pop_due_in_order(self):
+        self.scheduler.schedule(1, self.now + timedelta(minutes=2))
+        self.scheduler.schedule(2, self.now - timedelta(minutes=1))
+        self.scheduler.schedule(3, self.now)
+
+        assert self.scheduler.next_due() == self.now - timedelta(minutes=1)
+        assert self.scheduler.pop_due(self.now) == [2, 3]
+        assert self.scheduler.next_due() == self.now + timedelta(minutes=2)
+        assert len(self.scheduler) == 1
+
+    def test_reschedule_replaces_transition(self):
+        self.scheduler.schedule(1, self.now - timedelta(minutes=1))
+        self.scheduler.schedule(1, self.now + timedelta(minutes=1))
+
+        assert self.scheduler.pop_due(self.now) == []
+        assert self.scheduler.next_due() == self.now + timedelta(minutes=1)
+
+    def test_unschedule(self):
+        self.scheduler.schedule(1, self.now)
+        self.scheduler.schedule(1, None)
+
+        assert self.scheduler.next_due() is None
+        assert len(self.scheduler) == 0
@@ -196,3 +196,32 @@ class TestRulesRoutes:
         )
 
         assert response.status_code == 404
+
+    def test_get_rules_not_modified(self):
+        headers = {'Authorization': f'Bearer {self.user1_token}'}
+        etag = self.client.get("/api/rules/", headers=headers).headers['ETag']
+
+        response = self.client.get("/api/rules/", headers={**headers, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+
+    def test_get_rules_etag_changes_after_rule_write(self):
+        headers = {'Authorization': f'Bearer {self.user1_token}'}
+        etag = self.client.get("/api/rules/", headers=headers).headers['ETag']
+
+        make_request(self.client, "PATCH", f"/api/rules/{self.rule1.id}", token=self.user1_token, data={'boost': 7})
+        response = self.client.get("/api/rules/", headers={**headers, 'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_get_rule_not_modified(self):
+        headers = {'Authorization': f'Bearer {self.user1_token}'}
+        etag = self.client.get(f"/api/rules/{self.rule1.id}", headers=headers).headers['ETag']
+
+        response = self.client.get(f"/api/rules/{self.rule1.id}", headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+        response = self.client.get(f"/api/rules/{self.rule2.id}", headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
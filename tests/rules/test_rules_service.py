@@ -5,6 +5,7 @@ from src.priority.api.rules.models import Rule, Condition
 from src.priority.api.rules.schemas import ConditionCreateInput, RuleCreateInput, RuleUpdateInput
 from src.priority.api.rules.service import RuleService
 from src.priority.api.users.models import User
+from src.priority.core import CompiledRuleSetCache, CompiledRuleSet
 
 
 class TestRulesService:
@@ -107,3 +108,25 @@ class TestRulesService:
         # Verify rule is deleted
         with pytest.raises(NotFound):
             self.service.get(self.user1.id, self.rule1.id)
+
+    def test_rule_writes_bump_rules_version_and_invalidate_cache(self):
+        ruleset_cache = CompiledRuleSetCache()
+        service = RuleService(ruleset_cache)
+        rule_data = RuleCreateInput(
+            name="test rule",
+            boost=15,
+            conditions=[ConditionCreateInput(field="category", operator="equals", value="work")]
+        )
+
+        ruleset_cache.put(self.user1.id, 0, CompiledRuleSet(rules=()))
+        rule = service.create(self.user1.id, rule_data)
+        assert self.user1.rules_version == 1
+        assert ruleset_cache.get(self.user1.id, 0) is None
+
+        ruleset_cache.put(self.user1.id, 1, CompiledRuleSet(rules=()))
+        service.update(self.user1.id, rule.id, RuleUpdateInput(boost=5))
+        assert self.user1.rules_version == 2
+        assert ruleset_cache.get(self.user1.id, 1) is None
+
+        service.delete(self.user1.id, rule.id)
+        assert self.user1.rules_version == 3
@@ -0,0 +1,141 @@
+import io
+import json
+import pytest
+import sqlalchemy as sa
+from datetime import datetime, timezone
+
+from src.priority.api.rules.models import Rule, Condition
+from src.priority.api.tasks import imports as imports_module
+from src.priority.api.tasks.commands import tasks_cli
+from src.priority.api.tasks.imports import TaskImportService, read_csv, read_ndjson
+from src.priority.api.tasks.models import Task, Category, Tag
+from src.priority.api.tasks.service import TaskService
+from src.priority.api.users.models import User
+from src.priority.core import PriorityCalculator, ConditionEvaluator
+
+
+class TestTaskImportService:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, db):
+        self.db = db
+        self.import_service = TaskImportService(TaskService(PriorityCalculator(ConditionEvaluator())))
+
+        user = User(username="user1", email="user1@example.com")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Rule(name="urgent", boost=5, user_id=user.id, conditions=[
+            Condition(field="tag", operator="equals", value="urgent"),
+        ]))
+        db.session.commit()
+        self.user_id = user.id
+
+    def _tasks(self):
+        return self.db.session.scalars(sa.select(Task).order_by(Task.id)).all()
+
+    def test_import_ndjson(self):
+        lines = [
+            {"title": "Task 1", "category": "Work", "tags": ["urgent"]},
+            {"title": "Task 2", "duration": "PT1H", "deadline": "2025-09-20T15:30:00+00:00", "tags": ["urgent", "new"]},
+        ]
+        stream = io.StringIO("\n".join(json.dumps(line) for line in lines) + "\n\n")
+
+        result = self.import_service.import_tasks(self.user_id, read_ndjson(stream))
+
+        assert result.imported == 2
+        assert result.failed == 0
+        tasks = self._tasks()
+        assert [task.title for task in tasks] == ["Task 1", "Task 2"]
+        assert tasks[0].category.name == "work"
+        assert [task.priority_score for task in tasks] == [5, 5]
+        assert sorted(tag.name for tag in tasks[1].tags) == ["new", "urgent"]
+
+    def test_import_csv(self):
+        stream = io.StringIO(
+            "title,completed,duration,category,tags\n"
+            "Task 1,true,PT30M,work,urgent;new\n"
+            "Task 2,,,,\n"
+        )
+
+        result = self.import_service.import_tasks(self.user_id, read_csv(stream))
+
+        assert result.imported == 2
+        tasks = self._tasks()
+        assert tasks[0].completed is True
+        assert tasks[0].duration.total_seconds() == 1800
+        assert sorted(tag.name for tag in tasks[0].tags) == ["new", "urgent"]
+        assert tasks[1].category is None
+        assert tasks[1].tags == []
+
+    def test_import_csv_naive_deadline_and_long_values(self):
+        stream = io.StringIO(
+            "title,deadline,category,tags\n"
+            "Task 1,2025-09-09 15:30,work,urgent\n"
+            f"{'x' * 141},,,\n"
+            f"Task 3,,,{'t' * 51}\n"
+            "Task 4,,,\n"
+        )
+
+        result = self.import_service.import_tasks(self.user_id, read_csv(stream))
+
+        assert result.imported == 2
+        assert result.failed == 2
+        assert [error.line for error in result.errors] == [3, 4]
+        assert result.errors[0].message.startswith("title: String should have at most 140 characters")
+        tasks = self._tasks()
+        assert [task.title for task in tasks] == ["Task 1", "Task 4"]
+        assert tasks[0].deadline == datetime(2025, 9, 9, 15, 30, tzinfo=timezone.utc)
+        assert tasks[0].priority_score == 5
+
+    def test_import_in_chunks_reports_invalid_rows(self):
+        stream = io.StringIO(
+            '{"title": "Task 1", "tags": ["urgent"]}\n'
+            'not json\n'
+            '{"completed": true}\n'
+            '{"title": "Task 2", "tags": ["urgent"]}\n'
+            '["Task 3"]\n'
+            '{"title": "Task 4"}\n'
+        )
+        progress = []
+
+        result = self.import_service.import_tasks(
+            self.user_id, read_ndjson(stream), chunk_size=2, on_progress=lambda current: progress.append(current.imported)
+        )
+
+        assert result.imported == 3
+        assert result.failed == 3
+        assert [error.line for error in result.errors] == [2, 3, 5]
+        assert result.errors[1].message == "title: Field required"
+        assert progress == [1, 2, 3]
+        assert [task.title for task in self._tasks()] == ["Task 1", "Task 2", "Task 4"]
+        assert self.db.session.scalar(sa.select(sa.func.count()).select_from(Tag)) == 1
+
+    def test_import_errors_are_capped(self, monkeypatch):
+        monkeypatch.setattr(imports_module, "MAX_REPORTED_IMPORT_ERRORS", 2)
+        stream = io.StringIO("{}\n" * 5)
+
+        result = self.import_service.import_tasks(self.user_id, read_ndjson(stream))
+
+        assert result.failed == 5
+        assert len(result.errors) == 2
+
+    def test_import_command(self, app, tmp_path):
+        path = tmp_path / "tasks.csv"
+        path.write_text("title,category\nTask 1,work\nTask 2,home\n")
+
+        result = app.test_cli_runner().invoke(tasks_cli, ["import", str(self.user_id), str(path), "--chunk-size", "1"])
+
+        assert result.exit_code == 0
+        assert "Imported 1 tasks, 0 failed." in result.output
+        assert "Done, imported 2 tasks, 0 failed." in result.output
+        assert self.db.session.scalar(sa.select(sa.func.count()).select_from(Category)) == 2
+
+    def test_import_command_unknown_user(self, app, tmp_path):
+        path = tmp_path / "tasks.csv"
+        path.write_text("title\nTask 1\n")
+
+        result = app.test_cli_runner().invoke(tasks_cli, ["import", str(self.user_id + 1), str(path)])
+
+        assert result.exit_code == 2
+        assert f"User {self.user_id + 1} not found." in result.output
+        assert self._tasks() == []
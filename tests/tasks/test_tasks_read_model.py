@@ -0,0 +1,73 @@
+import pytest
+from datetime import timedelta
+
+from src.priority.api.tasks.models import Task, Category, Tag
+from src.priority.api.tasks.read_model import TaskRecord, CategoryRecord, TagRecord, task_records_query, to_task_record
+from src.priority.api.tasks.schemas import TaskResponse
+from src.priority.api.users.models import User
+
+
+class TestTaskReadModel:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, db):
+        self.db = db
+
+        user = User(username="user1", email="user1@example.com")
+        db.session.add(user)
+        db.session.flush()
+
+        category = Category(name="work", user_id=user.id)
+        urgent = Tag(name="urgent", user_id=user.id)
+        important = Tag(name="important", user_id=user.id)
+        task1 = Task(title="Task 1", duration=timedelta(hours=1), user_id=user.id, category=category,
+                     tags=[important, urgent])
+        task2 = Task(title="Task 2", user_id=user.id)
+
+        db.session.add_all([category, urgent, important, task1, task2])
+        db.session.commit()
+
+        self.category = category
+        self.urgent = urgent
+        self.important = important
+        self.task1 = task1
+        self.task2 = task2
+
+    def _records(self):
+        rows = self.db.session.execute(task_records_query().order_by(Task.id))
+        return [to_task_record(row) for row in rows]
+
+    def test_task_records(self):
+        records = self._records()
+
+        assert records == [
+            TaskRecord(
+                id=self.task1.id,
+                title="Task 1",
+                completed=False,
+                duration=timedelta(hours=1),
+                deadline=None,
+                created_at=self.task1.created_at,
+                category=CategoryRecord(self.category.id, "work"),
+                tags=tuple(sorted(
+                    [TagRecord(self.urgent.id, "urgent"), TagRecord(self.important.id, "important")],
+                    key=lambda tag: tag.id,
+                )),
+            ),
+            TaskRecord(
+                id=self.task2.id,
+                title="Task 2",
+                completed=False,
+                duration=None,
+                deadline=None,
+                created_at=self.task2.created_at,
+                category=None,
+                tags=(),
+            ),
+        ]
+
+    def test_task_record_response_matches_task_response(self):
+        records = self._records()
+
+        for record, task in zip(records, [self.task1, self.task2]):
+            assert TaskResponse.model_validate(record) == TaskResponse.model_validate(task)
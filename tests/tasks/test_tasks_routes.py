@@ -1,7 +1,9 @@
+import json
 import pytest
 from datetime import datetime, timedelta
 from flask_jwt_extended import create_access_token
 from tests.test_utils import make_request
+from src.priority.api.rules.models import Rule, Condition
 from src.priority.api.tasks.models import Task, Category, Tag
 from src.priority.api.users.models import User
 
@@ -102,6 +104,80 @@ class TestTasksRoutes:
         assert task_result['tasks'][0]['title'] == self.task2.title
         assert task_result['tasks'][0]['completed'] == True
 
+    def test_get_tasks_paginated(self):
+        response = make_request(
+            self.client,
+            "GET",
+            "/api/tasks/?order_by=created_at&limit=1",
+            token=self.user1_token
+        )
+
+        assert response.status_code == 200
+        first_page = response.get_json()
+        assert len(first_page['tasks']) == 1
+        assert first_page['next_cursor'] is not None
+
+        response = make_request(
+            self.client,
+            "GET",
+            f"/api/tasks/?order_by=created_at&limit=1&cursor={first_page['next_cursor']}",
+            token=self.user1_token
+        )
+
+        assert response.status_code == 200
+        second_page = response.get_json()
+        assert len(second_page['tasks']) == 1
+        assert second_page['tasks'][0]['id'] != first_page['tasks'][0]['id']
+
+    def test_get_tasks_invalid_cursor(self):
+        response = make_request(
+            self.client,
+            "GET",
+            "/api/tasks/?cursor=invalid",
+            token=self.user1_token
+        )
+
+        assert response.status_code == 400
+
+
+    def test_export_tasks(self):
+        response = make_request(
+            self.client,
+            "GET",
+            "/api/tasks/export",
+            token=self.user1_token
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        tasks_result = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [task['id'] for task in tasks_result] == [self.task1.id, self.task2.id]
+        assert tasks_result[0]['category']['name'] == 'work'
+        assert {tag['name'] for tag in tasks_result[0]['tags']} == {'urgent', 'important'}
+        assert 'priority_score' in tasks_result[0]
+
+    def test_import_tasks(self):
+        response = self.client.post(
+            "/api/tasks/import",
+            headers={'Authorization': f'Bearer {self.user1_token}', 'Content-Type': 'application/x-ndjson'},
+            data='{"title": "Imported", "tags": ["urgent"]}\n{"completed": false}\n'
+        )
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            'imported': 1,
+            'failed': 1,
+            'errors': [{'line': 2, 'message': 'title: Field required'}],
+        }
+
+    def test_import_tasks_unsupported_format(self):
+        response = self.client.post(
+            "/api/tasks/import",
+            headers={'Authorization': f'Bearer {self.user1_token}', 'Content-Type': 'text/plain'},
+            data='Imported'
+        )
+
+        assert response.status_code == 415
 
     def test_create_task(self):
         task_data = {
@@ -130,6 +206,24 @@ class TestTasksRoutes:
         assert len(task_result['tags']) == 2
         assert 'priority_score' in task_result
 
+    def test_create_task_naive_deadline_with_deadline_rule(self, db):
+        db.session.add(Rule(name="due", boost=5, user_id=self.user1.id, conditions=[
+            Condition(field="deadline", operator="less_than", value="P1D"),
+        ]))
+        self.user1.rules_version += 1
+        db.session.commit()
+
+        response = make_request(
+            self.client,
+            "POST",
+            "/api/tasks/",
+            token=self.user1_token,
+            data={'title': 'Due task', 'deadline': '2025-09-09 15:30'}
+        )
+
+        assert response.status_code == 201
+        assert response.get_json()['priority_score'] == 5
+
     def test_create_task_minimal(self):
         task_data = {
             'title': 'Simple task'
@@ -167,6 +261,114 @@ class TestTasksRoutes:
 
         assert response.status_code == 422
 
+    def test_create_tasks_bulk(self):
+        tasks_data = {
+            'tasks': [
+                {'title': 'Bulk task 1', 'category': 'work', 'tags': ['urgent', 'new']},
+                {'title': 'Bulk task 2', 'duration': 'PT1H', 'tags': ['new']},
+            ]
+        }
+
+        response = make_request(
+            self.client,
+            "POST",
+            "/api/tasks/bulk",
+            token=self.user1_token,
+            data=tasks_data
+        )
+
+        assert response.status_code == 201
+        tasks_result = response.get_json()['tasks']
+        assert [task['title'] for task in tasks_result] == ['Bulk task 1', 'Bulk task 2']
+        assert tasks_result[0]['category']['name'] == 'work'
+        assert {tag['name'] for tag in tasks_result[0]['tags']} == {'urgent', 'new'}
+        assert tasks_result[1]['duration'] == 'PT1H'
+
+    def test_create_tasks_bulk_naive_deadline(self):
+        response = make_request(
+            self.client,
+            "POST",
+            "/api/tasks/bulk",
+            token=self.user1_token,
+            data={'tasks': [{'title': 'Bulk task', 'deadline': '2025-09-09 15:30'}]}
+        )
+
+        assert response.status_code == 201
+        assert response.get_json()['tasks'][0]['deadline'].startswith('2025-09-09T15:30:00')
+
+    def test_create_tasks_bulk_empty(self):
+        response = make_request(
+            self.client,
+            "POST",
+            "/api/tasks/bulk",
+            token=self.user1_token,
+            data={'tasks': []}
+        )
+
+        assert response.status_code == 422
+
+    def test_complete_tasks_bulk(self):
+        response = make_request(
+            self.client,
+            "POST",
+            "/api/tasks/bulk/complete",
+            token=self.user1_token,
+            data={'tag': 'important'}
+        )
+
+        assert response.status_code == 200
+        tasks_result = response.get_json()['tasks']
+        assert [task['id'] for task in tasks_result] == [self.task1.id]
+        assert tasks_result[0]['completed'] is True
+
+    def test_update_tasks_bulk(self):
+        response = make_request(
+            self.client,
+            "PATCH",
+            "/api/tasks/bulk",
+            token=self.user1_token,
+            data={'selection': {'ids': [self.task1.id, self.task3.id]}, 'changes': {'duration': 'PT3H'}}
+        )
+
+        assert response.status_code == 200
+        tasks_result = response.get_json()['tasks']
+        assert [task['id'] for task in tasks_result] == [self.task1.id]
+        assert tasks_result[0]['duration'] == 'PT3H'
+
+    def test_update_tasks_bulk_null_completed(self):
+        response = make_request(
+            self.client,
+            "PATCH",
+            "/api/tasks/bulk",
+            token=self.user1_token,
+            data={'selection': {'ids': [self.task1.id]}, 'changes': {'completed': None}}
+        )
+
+        assert response.status_code == 422
+
+    def test_delete_tasks_bulk(self):
+        response = make_request(
+            self.client,
+            "POST",
+            "/api/tasks/bulk/delete",
+            token=self.user1_token,
+            data={'completed': True}
+        )
+
+        assert response.status_code == 200
+        assert response.get_json() == {'deleted': 1}
+
+    def test_bulk_selection_without_criteria(self):
+        response = make_request(
+            self.client,
+            "POST",
+            "/api/tasks/bulk/delete",
+            token=self.user1_token,
+            data={}
+        )
+
+        assert response.status_code == 422
+
     def test_get_task_success(self):
         response = make_request(
             self.client,
@@ -289,3 +491,72 @@ class TestTasksRoutes:
             token=self.user1_token
         )
         assert response.status_code == 404
+
+    def test_get_tasks_not_modified(self):
+        headers = {'Authorization': f'Bearer {self.user1_token}'}
+        response = self.client.get("/api/tasks/", headers=headers)
+
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+
+        response = self.client.get("/api/tasks/", headers={**headers, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.data == b''
+
+    def test_get_tasks_etag_depends_on_query(self):
+        headers = {'Authorization': f'Bearer {self.user1_token}'}
+        etag = self.client.get("/api/tasks/", headers=headers).headers['ETag']
+
+        response = self.client.get("/api/tasks/?completed=true", headers={**headers, 'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_get_tasks_etag_changes_after_task_write(self):
+        headers = {'Authorization': f'Bearer {self.user1_token}'}
+        etag = self.client.get("/api/tasks/", headers=headers).headers['ETag']
+
+        make_request(self.client, "POST", f"/api/tasks/{self.task1.id}/complete", token=self.user1_token)
+        response = self.client.get("/api/tasks/", headers={**headers, 'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_get_tasks_etag_changes_after_rule_write(self):
+        headers = {'Authorization': f'Bearer {self.user1_token}'}
+        etag = self.client.get("/api/tasks/", headers=headers).headers['ETag']
+
+        rule_data = {'name': 'work', 'boost': 5, 'conditions': [{'field': 'category', 'operator': 'equals', 'value': 'work'}]}
+        make_request(self.client, "POST", "/api/rules/", token=self.user1_token, data=rule_data)
+        response = self.client.get("/api/tasks/", headers={**headers, 'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_get_tasks_etag_ignores_other_users_writes(self):
+        headers = {'Authorization': f'Bearer {self.user1_token}'}
+        etag = self.client.get("/api/tasks/", headers=headers).headers['ETag']
+
+        make_request(self.client, "POST", f"/api/tasks/{self.task3.id}/complete", token=self.user2_token)
+        response = self.client.get("/api/tasks/", headers={**headers, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+
+    def test_get_task_not_modified(self):
+        headers = {'Authorization': f'Bearer {self.user1_token}'}
+        response = self.client.get(f"/api/tasks/{self.task1.id}", headers=headers)
+        etag = response.headers['ETag']
+
+        response = self.client.get(f"/api/tasks/{self.task1.id}", headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+        response = self.client.get(f"/api/tasks/{self.task2.id}", headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_get_task_error_has_no_etag(self):
+        response = make_request(self.client, "GET", f"/api/tasks/{self.task3.id}", token=self.user1_token)
+
+        assert response.status_code == 403
+        assert 'ETag' not in response.headers
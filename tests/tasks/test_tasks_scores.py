@@ -0,0 +1,148 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from src.priority.api.rules.models import Rule, Condition
+from src.priority.api.rules.schemas import ConditionCreateInput, RuleCreateInput, RuleUpdateInput
+from src.priority.api.rules.service import RuleService
+from src.priority.api.tasks.models import Task, Category, Tag
+from src.priority.api.tasks.schemas import TaskCreateInput, TasksFilterParams
+from src.priority.api.tasks.scores import TaskScoreService
+from src.priority.api.tasks.service import TaskService
+from src.priority.api.tasks.commands import tasks_cli
+from src.priority.api.users.models import User
+from src.priority.core import PriorityCalculator, ConditionEvaluator, ScoreRefreshScheduler
+
+
+class TestTaskScoreService:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, app, db):
+        app.config['PRIORITY_SCORING_BACKEND'] = 'materialized'
+        self.db = db
+        calculator = PriorityCalculator(ConditionEvaluator())
+        self.score_service = TaskScoreService(calculator)
+        self.task_service = TaskService(calculator, score_service=self.score_service)
+        self.rule_service = RuleService(task_score_service=self.score_service)
+
+        user = User(username="user1", email="user1@example.com")
+        db.session.add(user)
+        db.session.commit()
+        self.user = user
+
+        self.work_task = self.task_service.create(user.id, TaskCreateInput(title="Work", category="work"))
+        self.home_task = self.task_service.create(user.id, TaskCreateInput(title="Home", category="home"))
+
+    def _work_rule(self, boost):
+        return RuleCreateInput(
+            name="work",
+            boost=boost,
+            conditions=[ConditionCreateInput(field="category", operator="equals", value="work")]
+        )
+
+    def test_create_stores_score(self):
+        assert self.work_task.priority_score == 0
+        assert self.work_task.score_rules_version == 0
+        assert self.work_task.score_computed_at is not None
+        assert self.work_task.score_valid_until is None
+
+    def test_rule_write_rescores_only_affected_tasks(self):
+        home_computed_at = self.home_task.score_computed_at
+
+        rule = self.rule_service.create(self.user.id, self._work_rule(10))
+
+        assert self.work_task.priority_score == 10
+        assert self.work_task.score_rules_version == 1
+        assert self.home_task.priority_score == 0
+        assert self.home_task.score_rules_version == 1
+        assert self.home_task.score_computed_at == home_computed_at
+
+        self.rule_service.update(self.user.id, rule.id, RuleUpdateInput(boost=3))
+        assert self.work_task.priority_score == 3
+
+        self.rule_service.delete(self.user.id, rule.id)
+        assert self.work_task.priority_score == 0
+        assert self.work_task.score_rules_version == 3
+
+    @pytest.mark.parametrize("backend", ["python", "sql"])
+    def test_rule_write_keeps_stored_scores_of_other_backends(self, app, backend):
+        app.config['PRIORITY_SCORING_BACKEND'] = backend
+
+        self.rule_service.create(self.user.id, self._work_rule(10))
+
+        assert self.work_task.priority_score == 0
+        assert self.work_task.score_rules_version == 0
+        assert self.home_task.score_rules_version == 0
+
+    def test_duration_rule_write_moves_tasks_without_duration(self):
+        long_task = self.task_service.create(self.user.id, TaskCreateInput(title="Long", duration=timedelta(hours=2)))
+
+        self.rule_service.create(self.user.id, RuleCreateInput(
+            name="long",
+            boost=6,
+            conditions=[ConditionCreateInput(field="duration", operator="greater_than", value="PT1H")]
+        ))
+
+        assert long_task.priority_score == 6
+        assert long_task.score_rules_version == 1
+        assert self.work_task.priority_score == 0
+        assert self.work_task.score_rules_version == 1
+
+    def test_time_condition_sets_valid_until(self):
+        deadline = datetime.now(timezone.utc) + timedelta(days=3)
+        task = self.task_service.create(self.user.id, TaskCreateInput(title="Soon", deadline=deadline))
+
+        self.rule_service.create(self.user.id, RuleCreateInput(
+            name="soon",
+            boost=5,
+            conditions=[ConditionCreateInput(field="deadline", operator="less_than", value="P1D")]
+        ))
+
+        assert task.priority_score == 0
+        assert task.score_valid_until == deadline - timedelta(days=1)
+
+    def test_refresh_due_transitions(self):
+        now = datetime.now(timezone.utc)
+        self.rule_service.create(self.user.id, RuleCreateInput(
+            name="recent",
+            boost=5,
+            conditions=[ConditionCreateInput(field="created_at", operator="less_than", value="P1D")]
+        ))
+        task = self.db.session.get(Task, self.work_task.id)
+        assert task.priority_score == 5
+        assert task.score_valid_until == task.created_at + timedelta(days=1)
+
+        scheduler = ScoreRefreshScheduler()
+        assert self.score_service.schedule_transitions(scheduler, now + timedelta(days=2)) == 2
+        assert self.score_service.refresh_due(scheduler, now, now + timedelta(days=2)) == 0
+
+        due_at = now + timedelta(days=1, minutes=1)
+        assert self.score_service.refresh_due(scheduler, due_at, now + timedelta(days=2)) == 2
+        assert task.score_computed_at == due_at
+        assert task.priority_score == 0
+        assert task.score_valid_until is None
+        assert scheduler.next_due() is None
+
+    def test_refresh_all_stale(self, app):
+        self.db.session.add(Rule(name="work", boost=7, user_id=self.user.id, conditions=[
+            Condition(field="category", operator="equals", value="work"),
+        ]))
+        self.user.rules_version += 1
+        self.db.session.commit()
+
+        result = app.test_cli_runner().invoke(tasks_cli, ["refresh-scores"])
+
+        assert "Refreshed 2 task scores." in result.output
+        assert self.work_task.priority_score == 7
+        assert self.home_task.score_rules_version == 1
+
+    def test_get_filtered_materialized(self, app):
+        self.db.session.add(Rule(name="home", boost=4, user_id=self.user.id, conditions=[
+            Condition(field="category", operator="equals", value="home"),
+        ]))
+        self.user.rules_version += 1
+        self.db.session.commit()
+
+        tasks_result = self.task_service.get_filtered(self.user.id, TasksFilterParams())
+
+        assert [task.id for task in tasks_result] == [self.home_task.id, self.work_task.id]
+        assert [task.priority_score for task in tasks_result] == [4, 0]
@@ -1,10 +1,19 @@
 import pytest
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock
-from werkzeug.exceptions import NotFound, Forbidden
-
-from src.priority.api.tasks.models import Task, Category, Tag
-from src.priority.api.tasks.schemas import TaskCreateInput, TaskUpdateInput, TasksFilterParams
+import sqlalchemy as sa
+from pydantic import ValidationError
+from werkzeug.exceptions import NotFound, Forbidden, BadRequest
+
+from src.priority.api.rules.models import Rule, Condition
+from src.priority.api.tasks.models import Task, Category, Tag, task_tags
+from src.priority.api.tasks.schemas import (
+    TaskCreateInput, TaskUpdateInput, TasksFilterParams, TaskResponse, TasksBulkSelection, TasksBulkChanges
+)
+from src.priority.core import PriorityCalculator, ConditionEvaluator, CompiledRuleSet, utc_now
+from src.priority.api.tasks import service as task_service_module
 from src.priority.api.tasks.service import TaskService
+from src.priority.api.tasks.pagination import encode_cursor, next_page_cursor
 from src.priority.api.users.models import User
 
 
@@ -15,6 +24,9 @@ class TestTaskService:
         self.db = db
         self.priority_calculator = Mock()
         self.priority_calculator.calculate_task_score.return_value = 50
+        self.priority_calculator.next_score_change_at.return_value = None
+        self.priority_calculator.clock = utc_now
+        self.priority_calculator.compile_user_rules.return_value = CompiledRuleSet(rules=())
         self.service = TaskService(self.priority_calculator)
 
         user1 = User(username="user1", email="user1@example.com")
@@ -68,6 +80,73 @@ class TestTaskService:
         assert len(task_result.tags) == 1
         assert task_result.priority_score == 50
 
+    def test_create_many(self):
+        tasks_input = [
+            TaskCreateInput(title="Bulk 1", category="Work", tags=["urgent", "new", "urgent"]),
+            TaskCreateInput(title="Bulk 2", category="home", tags=["new"]),
+            TaskCreateInput(title="Bulk 3"),
+        ]
+        rules = [
+            Rule(name="work", boost=5, user_id=self.user1.id, conditions=[
+                Condition(field="category", operator="equals", value="work"),
+            ]),
+            Rule(name="new", boost=3, user_id=self.user1.id, conditions=[
+                Condition(field="tag", operator="equals", value="new"),
+            ]),
+        ]
+        self.db.session.add_all(rules)
+        self.db.session.commit()
+        service = TaskService(PriorityCalculator(ConditionEvaluator()))
+
+        tasks_result = service.create_many(self.user1.id, tasks_input)
+
+        assert [task.title for task in tasks_result] == ["Bulk 1", "Bulk 2", "Bulk 3"]
+        assert tasks_result[0].category is self.task1.category
+        assert sorted(tag.name for tag in tasks_result[0].tags) == ["new", "urgent"]
+        assert tasks_result[0].tags[0] in (self.task1.tags[0], tasks_result[1].tags[0])
+        assert tasks_result[1].tags == [tag for tag in tasks_result[0].tags if tag.name == "new"]
+        assert tasks_result[2].category is None
+        assert [task.priority_score for task in tasks_result] == [8, 3, 0]
+        assert self.db.session.scalar(
+            sa.select(sa.func.count()).select_from(Category).where(Category.user_id == self.user1.id)
+        ) == 2
+
+    def test_create_many_naive_deadline(self):
+        self.db.session.add(Rule(name="due", boost=5, user_id=self.user1.id, conditions=[
+            Condition(field="deadline", operator="less_than", value="P1D"),
+        ]))
+        self.db.session.commit()
+        service = TaskService(PriorityCalculator(ConditionEvaluator()))
+
+        tasks_result = service.create_many(self.user1.id, [TaskCreateInput(title="Due", deadline="2025-09-09 15:30")])
+
+        assert tasks_result[0].deadline == datetime(2025, 9, 9, 15, 30, tzinfo=timezone.utc)
+        assert tasks_result[0].priority_score == 5
+
+    def test_insert_many_user_not_found(self):
+        with pytest.raises(NotFound):
+            self.service.insert_many(self.user2.id + 1, [TaskCreateInput(title="Task")])
+
+    def test_create_many_statement_count_is_constant(self):
+        tasks_input = [
+            TaskCreateInput(title=f"Bulk {i}", category=f"category{i % 10}", tags=[f"tag{i % 20}", "urgent"])
+            for i in range(500)
+        ]
+        statements = []
+
+        def count_statement(*args):
+            statements.append(args)
+
+        sa.event.listen(self.db.engine, "before_cursor_execute", count_statement)
+        try:
+            tasks_result = self.service.create_many(self.user1.id, tasks_input)
+            responses = [TaskResponse.model_validate(task) for task in tasks_result]
+        finally:
+            sa.event.remove(self.db.engine, "before_cursor_execute", count_statement)
+
+        assert len(responses) == 500
+        assert len(statements) <= 10
+
     def test_get(self):
         task_result = self.service.get(self.user1.id, self.task1.id)
 
@@ -90,6 +169,175 @@ class TestTaskService:
         assert len(tasks_result) == 1
         assert tasks_result[0].title == "Task 1"
 
+    def test_export(self, monkeypatch):
+        monkeypatch.setattr(task_service_module, "EXPORT_CHUNK_SIZE", 1)
+
+        tasks_result = [(task.id, task.priority_score) for task in self.service.export(self.user1.id)]
+
+        assert tasks_result == [(self.task1.id, 50), (self.task2.id, 50)]
+
+    def test_get_filtered_statement_count_is_constant(self):
+        tags = [Tag(name=f"tag{i}", user_id=self.user1.id) for i in range(5)]
+        rules = [
+            Rule(name=f"rule{i}", boost=i, user_id=self.user1.id, conditions=[
+                Condition(field="tag", operator="equals", value=f"tag{i}"),
+                Condition(field="category", operator="equals", value="work"),
+            ])
+            for i in range(5)
+        ]
+        tasks = [
+            Task(title=f"Task {i}", user_id=self.user1.id, category=self.task1.category, tags=[tags[i % 5]])
+            for i in range(1000)
+        ]
+        self.db.session.add_all(tags + rules + tasks)
+        self.db.session.commit()
+        user_id = self.user1.id
+        self.db.session.expunge_all()
+
+        service = TaskService(PriorityCalculator(ConditionEvaluator()))
+        statements = []
+
+        def count_statement(*args):
+            statements.append(args)
+
+        sa.event.listen(self.db.engine, "before_cursor_execute", count_statement)
+        try:
+            tasks_result = service.get_filtered(user_id, TasksFilterParams())
+            responses = [TaskResponse.model_validate(task) for task in tasks_result]
+        finally:
+            sa.event.remove(self.db.engine, "before_cursor_execute", count_statement)
+
+        assert len(responses) == 100
+        assert responses[0].priority_score == 4
+        assert len(statements) <= 4
+
+    def test_get_filtered_sql_scoring_matches_python_scoring(self, app):
+        rules = [
+            Rule(name="work", boost=5, user_id=self.user1.id, conditions=[
+                Condition(field="category", operator="equals", value="Work"),
+            ]),
+            Rule(name="urgent soon", boost=10, user_id=self.user1.id, conditions=[
+                Condition(field="tag", operator="equals", value="urgent"),
+                Condition(field="deadline", operator="less_than", value="P1D"),
+            ]),
+            Rule(name="long", boost=20, user_id=self.user1.id, conditions=[
+                Condition(field="duration", operator="greater_than", value="PT1H"),
+                Condition(field="created_at", operator="less_than", value="P1D"),
+            ]),
+        ]
+        self.task1.deadline = datetime.now(timezone.utc) + timedelta(hours=2)
+        self.task1.tags[0].name = "Urgent"
+        self.task2.duration = timedelta(hours=2)
+        self.db.session.add_all(rules)
+        self.db.session.commit()
+
+        service = TaskService(PriorityCalculator(ConditionEvaluator()))
+        python_scores = {task.id: task.priority_score for task in service.get_filtered(self.user1.id, TasksFilterParams())}
+
+        app.config['PRIORITY_SCORING_BACKEND'] = 'sql'
+        tasks_result = service.get_filtered(self.user1.id, TasksFilterParams())
+        sql_scores = {task.id: task.priority_score for task in tasks_result}
+
+        assert sql_scores == python_scores == {self.task1.id: 15, self.task2.id: 20}
+        assert [task.id for task in tasks_result] == [self.task2.id, self.task1.id]
+
+        tasks_result = service.get_filtered(self.user1.id, TasksFilterParams(min_priority_score=16))
+        assert [task.id for task in tasks_result] == [self.task2.id]
+
+    @pytest.mark.parametrize("backend", ["python", "sql"])
+    def test_get_filtered_scores_at_injected_clock(self, app, backend):
+        app.config['PRIORITY_SCORING_BACKEND'] = backend
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.task1.deadline = now + timedelta(days=4)
+        self.db.session.add(Rule(name="later", boost=5, user_id=self.user1.id, conditions=[
+            Condition(field="deadline", operator="greater_than", value="P1D"),
+        ]))
+        self.db.session.commit()
+        service = TaskService(PriorityCalculator(ConditionEvaluator(), clock=lambda: now))
+
+        tasks_result = service.get_filtered(self.user1.id, TasksFilterParams())
+
+        assert {task.id: task.priority_score for task in tasks_result} == {self.task1.id: 5, self.task2.id: 0}
+
+    @pytest.mark.parametrize("backend", ["python", "sql"])
+    @pytest.mark.parametrize("order_by", ["priority_score", "deadline", "created_at"])
+    def test_get_filtered_keyset_pagination(self, app, backend, order_by):
+        app.config['PRIORITY_SCORING_BACKEND'] = backend
+        now = datetime.now(timezone.utc)
+        tasks = [
+            Task(title=f"Paged {i}", user_id=self.user1.id, category=self.task1.category if i % 2 else None,
+                 deadline=now + timedelta(days=i % 3) if i % 4 else None, created_at=now - timedelta(hours=i % 3))
+            for i in range(9)
+        ]
+        rule = Rule(name="work", boost=5, user_id=self.user1.id, conditions=[
+            Condition(field="category", operator="equals", value="work"),
+        ])
+        self.db.session.add_all(tasks + [rule])
+        self.db.session.commit()
+        service = TaskService(PriorityCalculator(ConditionEvaluator()))
+
+        all_ids = [task.id for task in service.get_filtered(self.user1.id, TasksFilterParams(order_by=order_by))]
+
+        paged_ids = []
+        filters = TasksFilterParams(order_by=order_by, limit=2)
+        while True:
+            page = service.get_filtered(self.user1.id, filters)
+            paged_ids.extend(task.id for task in page)
+            cursor = next_page_cursor(page, filters)
+            if cursor is None:
+                break
+            filters = TasksFilterParams(order_by=order_by, limit=2, cursor=cursor)
+
+        assert len(all_ids) == 11
+        assert paged_ids == all_ids
+
+    def test_get_filtered_top_priority_in_chunks(self, monkeypatch):
+        monkeypatch.setattr(task_service_module, "SCORING_CHUNK_SIZE", 2)
+        tag = Tag(name="important", user_id=self.user1.id)
+        tasks = [
+            Task(title=f"Top {i}", user_id=self.user1.id, tags=[tag] if i % 3 == 0 else [])
+            for i in range(7)
+        ]
+        rules = [
+            Rule(name="important", boost=10, user_id=self.user1.id, conditions=[
+                Condition(field="tag", operator="equals", value="important"),
+            ]),
+            Rule(name="work", boost=5, user_id=self.user1.id, conditions=[
+                Condition(field="category", operator="equals", value="work"),
+            ]),
+        ]
+        self.db.session.add_all(tasks + rules)
+        self.db.session.commit()
+        service = TaskService(PriorityCalculator(ConditionEvaluator()))
+
+        tasks_result = service.get_filtered(self.user1.id, TasksFilterParams(limit=3))
+        assert [task.id for task in tasks_result] == [tasks[0].id, tasks[3].id, tasks[6].id]
+
+        tasks_result = service.get_filtered(self.user1.id, TasksFilterParams(limit=5, min_priority_score=5))
+        assert [task.id for task in tasks_result] == [tasks[0].id, tasks[3].id, tasks[6].id, self.task1.id]
+
+    def test_get_filtered_min_priority_score_matches_tag_case_insensitively(self):
+        self.task1.tags[0].name = "Urgent"
+        rule = Rule(name="urgent", boost=10, user_id=self.user1.id, conditions=[
+            Condition(field="tag", operator="equals", value="urgent"),
+        ])
+        self.db.session.add(rule)
+        self.db.session.commit()
+        service = TaskService(PriorityCalculator(ConditionEvaluator()))
+
+        tasks_result = service.get_filtered(self.user1.id, TasksFilterParams(min_priority_score=5))
+        assert [task.id for task in tasks_result] == [self.task1.id]
+
+    @pytest.mark.parametrize("order_by, cursor", [
+        ("priority_score", "invalid"),
+        ("priority_score", encode_cursor("priority_score", ("abc", 3))),
+        ("priority_score", encode_cursor("priority_score", (True, 3))),
+        ("created_at", encode_cursor("created_at", (None, 3))),
+    ])
+    def test_get_filtered_invalid_cursor(self, order_by, cursor):
+        with pytest.raises(BadRequest):
+            self.service.get_filtered(self.user1.id, TasksFilterParams(order_by=order_by, cursor=cursor))
+
     def test_update(self):
         update_input = TaskUpdateInput(
             title="Updated Task",
@@ -101,6 +349,26 @@ class TestTaskService:
         assert task_result.title == "Updated Task"
         assert task_result.completed is True
 
+    def test_create_and_update_naive_deadline(self):
+        self.db.session.add(Rule(name="due", boost=5, user_id=self.user1.id, conditions=[
+            Condition(field="deadline", operator="less_than", value="P1D"),
+        ]))
+        self.db.session.commit()
+        service = TaskService(PriorityCalculator(ConditionEvaluator()))
+        deadline = (datetime.now(timezone.utc) + timedelta(days=3)).replace(microsecond=0)
+
+        task_result = service.create(self.user1.id, TaskCreateInput(
+            title="Due", deadline=deadline.replace(tzinfo=None).isoformat()
+        ))
+
+        assert task_result.priority_score == 0
+        assert task_result.score_valid_until == deadline - timedelta(days=1)
+
+        task_result = service.update(self.user1.id, task_result.id, TaskUpdateInput(deadline="2025-09-09 15:30"))
+
+        assert task_result.deadline == datetime(2025, 9, 9, 15, 30, tzinfo=timezone.utc)
+        assert task_result.priority_score == 5
+
     def test_update_tags_replacement(self):
         update_input = TaskUpdateInput(tags=["new_tag"])
 
@@ -122,6 +390,75 @@ class TestTaskService:
         with pytest.raises(NotFound):
             self.service.get(self.user1.id, task_id)
 
+    def test_complete_many_by_tag(self):
+        self.db.session.add(Rule(name="urgent", boost=5, user_id=self.user1.id, conditions=[
+            Condition(field="tag", operator="equals", value="urgent"),
+        ]))
+        self.db.session.commit()
+        service = TaskService(PriorityCalculator(ConditionEvaluator()))
+
+        tasks_result = service.complete_many(self.user1.id, TasksBulkSelection(tag="urgent"))
+
+        assert [task.id for task in tasks_result] == [self.task1.id]
+        assert tasks_result[0].completed is True
+        assert tasks_result[0].priority_score == 5
+
+    def test_update_many_by_ids(self):
+        deadline = datetime(2025, 9, 9, 15, 30, tzinfo=timezone.utc)
+        selection = TasksBulkSelection(ids=[self.task1.id, self.task2.id, self.task3.id])
+
+        tasks_result = self.service.update_many(
+            self.user1.id, selection, TasksBulkChanges(deadline=deadline, category="Home")
+        )
+
+        assert [task.id for task in tasks_result] == [self.task1.id, self.task2.id]
+        assert all(task.deadline == deadline for task in tasks_result)
+        assert all(task.category.name == "home" for task in tasks_result)
+        assert self.task3.category is None
+
+    def test_update_many_no_selected_tasks_keeps_categories(self):
+        tasks_result = self.service.update_many(
+            self.user1.id, TasksBulkSelection(tag="missing"), TasksBulkChanges(category="Home")
+        )
+
+        assert tasks_result == []
+        assert self.db.session.scalars(sa.select(Category.name)).all() == ["work"]
+
+    def test_bulk_changes_null_completed(self):
+        assert TasksBulkChanges().model_dump(exclude_unset=True) == {}
+        with pytest.raises(ValidationError):
+            TasksBulkChanges(completed=None)
+
+    def test_update_many_remove_category(self):
+        tasks_result = self.service.update_many(
+            self.user1.id, TasksBulkSelection(category="work"), TasksBulkChanges(category=None)
+        )
+
+        assert [task.id for task in tasks_result] == [self.task1.id]
+        assert tasks_result[0].category is None
+
+    def test_delete_many(self):
+        task_ids = [self.task1.id, self.task2.id, self.task3.id]
+
+        deleted = self.service.delete_many(self.user1.id, TasksBulkSelection(ids=task_ids))
+
+        assert deleted == 2
+        remaining_ids = self.db.session.scalars(sa.select(Task.id)).all()
+        assert remaining_ids == [task_ids[2]]
+        assert self.db.session.scalar(sa.select(sa.func.count()).select_from(task_tags)) == 0
+
+    def test_delete_many_by_tag(self):
+        self.task1.tags[0].name = "Urgent"
+        self.db.session.commit()
+        task_id = self.task1.id
+
+        deleted = self.service.delete_many(self.user1.id, TasksBulkSelection(tag="urgent"))
+
+        assert deleted == 1
+        remaining_ids = self.db.session.scalars(sa.select(Task.id).order_by(Task.id)).all()
+        assert task_id not in remaining_ids
+        assert self.db.session.scalar(sa.select(sa.func.count()).select_from(task_tags)) == 0
+
     def test_get_or_create_user_category_new(self):
         category_result = self.service._get_or_create_user_category(self.user1.id, "Personal")
 
@@ -133,3 +470,21 @@ class TestTaskService:
 
         assert len(tags_result) == 1
         assert tags_result[0].name == "new_tag"
+
+    def test_get_or_create_user_tags_existing_and_new(self):
+        existing_tag = self.task1.tags[0]
+
+        tags_result = self.service._get_or_create_user_tags(self.user1.id, ["new_tag", "urgent", "new_tag"])
+        tags_again = self.service._get_or_create_user_tags(self.user1.id, ["urgent", "new_tag"])
+
+        assert [tag.name for tag in tags_result] == ["new_tag", "urgent"]
+        assert tags_result[1] is existing_tag
+        assert tags_again == [tags_result[1], tags_result[0]]
+        assert self.db.session.scalar(
+            sa.select(sa.func.count()).select_from(Tag).where(Tag.user_id == self.user1.id)
+        ) == 2
+
+    def test_get_or_create_user_category_existing(self):
+        category_result = self.service._get_or_create_user_category(self.user1.id, "Work")
+
+        assert category_result is self.task1.category
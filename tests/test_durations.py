@@ -0,0 +1,33 @@
+import pytest
+from datetime import timedelta
+from pydantic import TypeAdapter, ValidationError
+
+from src.priority.durations import parse_duration
+
+
+class TestParseDuration:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        parse_duration.cache_clear()
+        self.adapter = TypeAdapter(timedelta)
+
+    @pytest.mark.parametrize('value', [
+        'PT2H', 'P1D', 'P1DT2H30M', 'PT0.5S', '-PT1H', '+PT1H', 'P1W', 'P2W3D', 'P0.5D', 'P1,5D',
+        'P1Y', 'P1M', 'P1DT', 'PT90M', 'PT1.123456789S', 'P1Y2M3W4DT5H6M7.8S', '1:00:00', '1 day, 01:00:00',
+    ])
+    def test_matches_pydantic(self, value):
+        assert parse_duration(value) == self.adapter.validate_python(value)
+
+    @pytest.mark.parametrize('value', ['P', 'PT', 'pt2h', 'P-1D', '2 hours', ''])
+    def test_invalid_value(self, value):
+        with pytest.raises(ValidationError):
+            parse_duration(value)
+
+    def test_parsed_values_are_cached(self):
+        parse_duration('PT2H')
+        parse_duration('PT2H')
+
+        cache_info = parse_duration.cache_info()
+        assert cache_info.hits == 1
+        assert cache_info.misses == 1
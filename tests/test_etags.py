@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from src.priority.api.etags import ETagService
+from src.priority.api.rules.models import Rule, Condition
+from src.priority.api.users.models import User
+from src.priority.core import PriorityCalculator, ConditionEvaluator, CompiledRuleSetCache
+
+
+class TestETagService:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, app, db):
+        self.db = db
+        self.now = datetime(2025, 1, 1, 12, 0, 30, tzinfo=timezone.utc)
+        app.config['ETAG_TIME_BUCKET_SECONDS'] = 60
+
+        priority_calculator = PriorityCalculator(ConditionEvaluator(), CompiledRuleSetCache(), clock=lambda: self.now)
+        self.etag_service = ETagService(priority_calculator)
+
+        self.user = User(username="user1", email="user1@example.com")
+        db.session.add(self.user)
+        db.session.commit()
+
+    def add_rule(self, field, operator, value):
+        condition = Condition(field=field, operator=operator, value=value)
+        self.db.session.add(Rule(name="rule", boost=5, user_id=self.user.id, conditions=[condition]))
+        self.user.rules_version += 1
+        self.db.session.commit()
+
+    def test_tasks_etag_is_stable(self):
+        etag = self.etag_service.tasks_etag(self.user.id, 'query')
+
+        assert self.etag_service.tasks_etag(self.user.id, 'query') == etag
+        assert self.etag_service.tasks_etag(self.user.id, 'other query') != etag
+
+    def test_tasks_etag_changes_with_versions(self):
+        etag = self.etag_service.tasks_etag(self.user.id)
+
+        self.user.tasks_version += 1
+        self.db.session.commit()
+
+        assert self.etag_service.tasks_etag(self.user.id) != etag
+
+    def test_tasks_etag_without_time_rules_ignores_time(self):
+        self.add_rule('category', 'equals', 'work')
+        etag = self.etag_service.tasks_etag(self.user.id)
+
+        self.now += timedelta(hours=1)
+
+        assert self.etag_service.tasks_etag(self.user.id) == etag
+
+    def test_tasks_etag_with_time_rules_changes_with_time_bucket(self):
+        self.add_rule('deadline', 'less_than', 'P1D')
+        etag = self.etag_service.tasks_etag(self.user.id)
+
+        self.now += timedelta(seconds=20)
+        assert self.etag_service.tasks_etag(self.user.id) == etag
+
+        self.now += timedelta(seconds=20)
+        assert self.etag_service.tasks_etag(self.user.id) != etag
+
+    def test_rules_etag_ignores_task_writes(self):
+        etag = self.etag_service.rules_etag(self.user.id)
+
+        self.user.tasks_version += 1
+        self.db.session.commit()
+        assert self.etag_service.rules_etag(self.user.id) == etag
+
+        self.add_rule('category', 'equals', 'work')
+        assert self.etag_service.rules_etag(self.user.id) != etag
@@ -0,0 +1,31 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from flask import jsonify
+
+from src.priority.api.tasks.schemas import TaskResponse
+
+
+class TestPydanticJSONProvider:
+
+    def test_jsonify_model(self, app):
+        task = TaskResponse(
+            id=1,
+            priority_score=10,
+            title="Task",
+            completed=False,
+            duration=timedelta(hours=1),
+            created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        )
+
+        with app.app_context():
+            response = jsonify(task)
+
+        assert response.mimetype == "application/json"
+        assert json.loads(response.get_data()) == task.model_dump(mode="json")
+
+    def test_jsonify_data(self, app):
+        with app.app_context():
+            response = jsonify({"deadline": datetime(2025, 1, 1, tzinfo=timezone.utc), "tags": ["urgent"]})
+
+        assert json.loads(response.get_data()) == {"deadline": "2025-01-01T00:00:00Z", "tags": ["urgent"]}